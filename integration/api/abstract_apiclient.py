@@ -102,6 +102,20 @@ class AbsApiClient(with_metaclass(ABCMeta)):
     def get_product_templates(self):
         return
 
+    @abstractmethod
+    def get_updated_product_template_ids(self, date_from):
+        """
+        Return ids of the product templates updated after `date_from` (naive UTC datetime)
+        """
+        return
+
+    @abstractmethod
+    def get_all_product_template_ids(self):
+        """
+        Return ids of all existing product templates, without any filtering
+        """
+        return
+
     @abstractmethod
     def receive_orders(self):
         """
@@ -111,6 +125,16 @@ class AbsApiClient(with_metaclass(ABCMeta)):
         """
         return
 
+    @abstractmethod
+    def receive_order(self, order_id):
+        """
+        Receive single order and prepare input file information in the same format as
+        `receive_orders()`. Return None if the order shouldn't be received yet
+
+        :return:
+        """
+        return
+
     @abstractmethod
     def parse_order(self, input_file):
         """
@@ -146,6 +170,16 @@ class AbsApiClient(with_metaclass(ABCMeta)):
         """
         return []
 
+    def validate_templates(self, templates):
+        """
+        Batch version of the `validate_template()`. Returns one joint list of mappings
+        to delete in the same format
+        """
+        mappings_to_delete = []
+        for template in templates:
+            mappings_to_delete.extend(self.validate_template(template))
+        return mappings_to_delete
+
     @abstractmethod
     def find_existing_template(self, template):
         """
@@ -170,8 +204,30 @@ class AbsApiClient(with_metaclass(ABCMeta)):
     def export_template(self, template):
         return
 
+    @abstractmethod
+    def get_product_image_ids(self, product_code):
+        """
+        Return ids of the images that currently exist for the product in external system
+        """
+        return
+
     @abstractmethod
     def export_images(self, images):
+        """
+        Delete outdated images and upload new ones. Expected format:
+            {
+                'template': {'id': <product external id>, ...},
+                'delete': [<image external id>, ...],
+                'upload': [
+                    {'checksum': <checksum>, 'path': <filestore path>},
+                    {'checksum': <checksum>, 'data': <base64 image>},
+                    ...
+                ],
+                ...
+            }
+
+        :return: {<checksum>: <image external id>} for uploaded images
+        """
         return
 
     @abstractmethod
@@ -190,10 +246,40 @@ class AbsApiClient(with_metaclass(ABCMeta)):
     def export_feature_value(self, feature_value):
         return
 
+    def export_attributes(self, attributes):
+        """
+        Batch versions of the `export_attribute()`, `export_attribute_value()`,
+        `export_feature()` and `export_feature_value()`.
+
+        :return: external codes of the created records in the same order
+        """
+        return [self.export_attribute(x) for x in attributes]
+
+    def export_attribute_values(self, attribute_values):
+        return [self.export_attribute_value(x) for x in attribute_values]
+
+    def export_features(self, features):
+        return [self.export_feature(x) for x in features]
+
+    def export_feature_values(self, feature_values):
+        return [self.export_feature_value(x) for x in feature_values]
+
     @abstractmethod
     def export_category(self, category):
         return
 
+    def export_prices(self, prices):
+        """
+        Update only prices of the already exported products. Expected format:
+            [
+                {'external_id': <template or variant external id>, 'price': 10.0, ...},
+                ...
+            ]
+        """
+        raise NotImplementedError(
+            _('Price export is not supported by "%s" integration') % self._integration_name
+        )
+
     @abstractmethod
     def export_inventory(self, inventory):
         """Send actual QTY to the external services"""
@@ -211,6 +297,15 @@ class AbsApiClient(with_metaclass(ABCMeta)):
     def get_product_for_import(self, product_code, import_images=False):
         return
 
+    @abstractmethod
+    def get_products_for_import(self, product_codes, import_images=False):
+        """
+        Batch version of the `get_product_for_import()`
+
+        :return: {product_code: (template, variants, bom_components, images)}
+        """
+        return
+
     @abstractmethod
     def get_templates_and_products_for_validation_test(self, product_refs=None):
         """
@@ -92,7 +92,8 @@ class IntegrationWebhook:
             _logger.error('Webhook unrecognized integration.')
             return False
 
-        name = self.integration.name
+        context = self.integration._get_webhook_verification_context()
+        name = context['name']
 
         # 2. Verify headers
         headers_ok = self.check_essential_headers()
@@ -103,29 +104,25 @@ class IntegrationWebhook:
 
         # 3. Verify forwarded host
         shop_domain = self.get_shop_domain()
-        adapter = self.integration._build_adapter()
-        settings_url = adapter.get_settings_value('url')
 
-        if settings_url not in shop_domain:
+        if context['url'] not in shop_domain:
             _logger.error('%s webhook invalid shop domain "%s".', name, shop_domain)
             return False
 
         # 4. Verify integration webhook-lines
-        if not self.integration.webhook_line_ids:
+        if not context['has_webhooks']:
             _logger.warning('%s webhooks not specified.', name)
             return False
 
         # 5. Verify webhook-line activation
         topic = self.get_webhook_topic()
-        webhook_line_id = self.integration.webhook_line_ids\
-            .filtered(lambda x: x.technical_name == topic)
 
-        if not webhook_line_id.is_active:
+        if topic not in context['active_topics']:
             _logger.warning('Disabled %s webhook in Odoo "%s".', name, topic)
             return False
 
         # 6. Verify webhook digital sign
-        sign_ok = self._check_webhook_digital_sign(adapter)
+        sign_ok = self._check_webhook_digital_sign(context)
         if not sign_ok:
             _logger.error('Wrong %s webhook digital signature.', name)
             return False
@@ -133,13 +130,23 @@ class IntegrationWebhook:
         _logger.info('%s: webhook has been verified.', name)
         return True
 
+    def store_webhook_event(self):
+        """Save webhook to the inbox. It will be processed by the job later."""
+        topic = self.get_webhook_topic()
+        event = self.env['integration.webhook.event'].store_event(
+            self.integration,
+            topic,
+            self._get_post_data(),
+        )
+        return bool(event)
+
     def _get_headers(self):
         return request.httprequest.headers
 
     def _get_post_data(self):
         return json.loads(request.httprequest.data)
 
-    def _check_webhook_digital_sign(self, adapter):
+    def _check_webhook_digital_sign(self, verification_context):
         raise NotImplementedError
 
     @staticmethod
@@ -154,9 +161,6 @@ class IntegrationWebhook:
     def _get_hook_shop_header():
         raise NotImplementedError
 
-    def _get_hook_name_method(self):
-        raise NotImplementedError
-
     def _save_log(self, *args, **kw):
         message_dict = {
             'ARGS: ': args,
@@ -193,7 +197,3 @@ class IntegrationWebhook:
         _logger.info('%s WEBHOOK DEBUG', self.integration_type)
         _logger.info(message_data)
         _logger.info(LOG_SEPARATOR)
-
-    def _run_method_from_header(self):
-        name_method = self._get_hook_name_method()
-        return getattr(self, name_method)()
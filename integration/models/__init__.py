@@ -9,6 +9,8 @@ from . import auto_workflow
 
 from . import ir_module
 from . import product_image
+from . import integration_product_image_sync
+from . import integration_product_price_sync
 from . import product_template
 from . import product_product
 from . import product_template_attribute_value
@@ -19,6 +21,7 @@ from . import product_feature_value
 from . import product_template_feature_line
 from . import product_public_category
 from . import integration_webhook_line
+from . import integration_webhook_event
 from . import sale_integration
 from . import sale_integration_api_field
 from . import sale_integration_file
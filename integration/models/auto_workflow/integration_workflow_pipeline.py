@@ -106,6 +106,47 @@ class IntegrationWorkflowPipelineLine(models.Model):
         self.state = FAILED
         return result
 
+    def _run_batch(self):
+        """
+        Run tasks of the same step for several orders. When orders model has the set-wise
+        `_integration_<step>_batch` method it's tried first for all the tasks at once,
+        otherwise (or if it fails) every task is run in its own savepoint.
+        Return tasks failed with an exception.
+        """
+        step_method = self[:1].current_step_method
+        orders = self.mapped('order_id')
+        self.write({'state': IN_PROCESS})
+
+        batch_method = getattr(orders, f'_integration_{step_method}_batch', None)
+        if batch_method:
+            try:
+                with self.env.cr.savepoint():
+                    result, message = batch_method()
+            except Exception as ex:
+                _logger.warning('Batch workflow step "%s" failed: %s', step_method, ex)
+            else:
+                if result is True:
+                    _logger.info(message)
+                    self.write({'state': DONE})
+                    return self.browse()
+
+        failed_tasks = self.browse()
+        for task in self:
+            order_method = getattr(task.order_id, f'_integration_{step_method}')
+            try:
+                with self.env.cr.savepoint():
+                    result, message = order_method()
+            except Exception as ex:
+                _logger.warning(
+                    'Workflow step "%s" of %s failed: %s', step_method, task.order_id, ex
+                )
+                failed_tasks |= task
+                result = False
+
+            task.state = DONE if result is True else FAILED
+
+        return failed_tasks
+
     def _validate_previous(self):
         states = self.pipeline_id.pipeline_task_ids\
             .filtered(lambda x: x.id < self.id and x.state != SKIP).mapped('state')
@@ -189,6 +230,44 @@ class IntegrationWorkflowPipeline(models.Model):
 
         return task_to_run.run_with_delay()
 
+    def run_pipelines_batch(self):
+        """
+        Run several pipelines in one job. On every round the current tasks of all
+        the pipelines are grouped by step and every group is run set-wise, so e.g. all
+        the orders are confirmed together and then all the invoices are posted together.
+        A failed task stops only its own pipeline, the ones failed with an exception
+        are re-queued as single pipeline jobs to show the error.
+        """
+        failed_tasks = self.env['integration.workflow.pipeline.line']
+        pipelines = self
+
+        while pipelines:
+            tasks = pipelines._get_current_tasks()
+
+            for step_method in set(tasks.mapped('current_step_method')):
+                step_tasks = tasks.filtered(lambda x: x.current_step_method == step_method)
+                failed_tasks |= step_tasks._run_batch()
+
+            pipelines = tasks.filtered(lambda x: x.state == DONE).mapped('pipeline_id')
+
+        for pipeline in failed_tasks.mapped('pipeline_id'):
+            job_kwargs = pipeline.order_id._build_workflow_job_kwargs()
+            pipeline.with_delay(**job_kwargs).trigger_pipeline()
+
+        failed_pipelines = self.filtered(
+            lambda x: FAILED in x.pipeline_task_ids.mapped('state')
+        )
+        return _('Pipelines processed: %s, failed: %s') % (len(self), len(failed_pipelines))
+
+    def _get_current_tasks(self):
+        tasks = self.env['integration.workflow.pipeline.line']
+
+        for pipeline in self:
+            tasks |= pipeline.pipeline_task_ids\
+                .filtered(lambda x: x.state not in (SKIP, DONE))[:1]
+
+        return tasks
+
     def _call_next_step(self, next_step_name):
         task_to_run = self.pipeline_task_ids\
             .filtered(lambda x: x.current_step_method == next_step_name)
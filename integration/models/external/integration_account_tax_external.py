@@ -33,6 +33,9 @@ class IntegrationAccountTaxExternal(models.Model):
 
         odoo_model.create_or_update_mapping(self.integration_id, None, self)
 
+    def _get_mapping_key(self):
+        return None
+
     def import_taxes(self):
         integrations = self.mapped('integration_id')
 
@@ -43,6 +43,9 @@ class IntegrationAccountTaxGroupExternal(models.Model):
 
         odoo_model.create_or_update_mapping(self.integration_id, None, self)
 
+    def _get_mapping_key(self):
+        return None
+
     def import_tax_group(self, external_values):
         self.ensure_one()
 
@@ -4,9 +4,11 @@ from ...exceptions import NoReferenceFieldDefined, NoExternal, ApiImportError
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 from odoo.osv import expression
+from odoo.tools import split_every
 from odoo.tools.sql import escape_psql
 
 import logging
+from collections import defaultdict
 
 _logger = logging.getLogger(__name__)
 
@@ -15,6 +17,7 @@ RESULT_ALREADY_MAPPED = 2
 RESULT_MAPPED = 3
 RESULT_EXISTS = 4
 RESULT_NOT_IN_EXTERNAL = 5
+MAPPING_KEYS_BLOCK_SIZE = 200
 
 
 class IntegrationExternalMixin(models.AbstractModel):
@@ -60,9 +63,9 @@ class IntegrationExternalMixin(models.AbstractModel):
         self.requeue_jobs_if_needed()
         return result
 
-    @api.model
-    def create(self, vals):
-        result = super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        result = super().create(vals_list)
         result.requeue_jobs_if_needed()
         return result
 
@@ -143,6 +146,109 @@ class IntegrationExternalMixin(models.AbstractModel):
 
         odoo_model.create_or_update_mapping(self.integration_id, odoo_object, self)
 
+    @api.model
+    def map_external_records(self, integration, odoo_model):
+        """
+        Set-based version of the `try_map_by_external_reference()` for all the external
+        records of the integration. Odoo records are indexed once by normalized reference,
+        missing mappings are created in bulk. Externals matching several Odoo records
+        are left unmapped and returned, so they can be reviewed
+        """
+        mapping_model = self.env[f'integration.{odoo_model._name}.mapping']
+        internal_field_name, external_field_name = mapping_model._mapping_fields
+
+        externals = self.search([
+            ('integration_id', '=', integration.id),
+        ])
+        mappings = mapping_model.search([
+            ('integration_id', '=', integration.id),
+            (external_field_name, 'in', externals.ids),
+        ])
+        mapping_by_external = {x[external_field_name].id: x for x in mappings}
+
+        externals -= mappings.filtered(internal_field_name).mapped(external_field_name)
+
+        external_keys = {x.id: x._get_mapping_key() for x in externals}
+        keys = set(filter(None, external_keys.values()))
+        index = self._get_odoo_mapping_index(integration, odoo_model, keys) if keys else {}
+
+        ambiguous_externals = self.browse()
+        vals_list = []
+        mapping_ids_by_odoo_id = defaultdict(list)
+
+        for external in externals:
+            if not self._is_mapping_key_resolved(external_keys[external.id], index):
+                continue
+
+            odoo_ids = index.get(external_keys[external.id], [])
+            if len(odoo_ids) > 1:
+                ambiguous_externals |= external
+
+            odoo_id = odoo_ids[0] if len(odoo_ids) == 1 else False
+            mapping = mapping_by_external.get(external.id)
+
+            if not mapping:
+                vals_list.append({
+                    'integration_id': integration.id,
+                    external_field_name: external.id,
+                    internal_field_name: odoo_id,
+                })
+            elif odoo_id:
+                mapping_ids_by_odoo_id[odoo_id].append(mapping.id)
+
+        mapping_model.create(vals_list)
+
+        for odoo_id, mapping_ids in mapping_ids_by_odoo_id.items():
+            mapping_model.browse(mapping_ids).write({internal_field_name: odoo_id})
+
+        if ambiguous_externals:
+            _logger.warning(
+                '%s: several Odoo records match external records %s, they are left unmapped',
+                self._description,
+                ambiguous_externals.mapped('code'),
+            )
+
+        return ambiguous_externals
+
+    def _get_mapping_key(self):
+        """
+        Normalized value used to find Odoo record in the `map_external_records()`.
+        Return None when external record shouldn't be matched automatically
+        """
+        self.ensure_one()
+        return (self.external_reference or '').lower() or None
+
+    @api.model
+    def _get_odoo_mapping_index(self, integration, odoo_model, keys):
+        """
+        Return {<normalized reference>: [<odoo id>, ...]} for the Odoo records matching keys
+        """
+        reference_field_name = getattr(odoo_model, '_internal_reference_field', None)
+        if not reference_field_name:
+            raise NoReferenceFieldDefined(
+                _('No _internal_reference_field field defined for model %s') % self._name
+            )
+
+        index = defaultdict(list)
+        for block in split_every(MAPPING_KEYS_BLOCK_SIZE, keys):
+            domain = expression.OR([
+                [(reference_field_name, '=ilike', escape_psql(x))] for x in block
+            ])
+            for record in odoo_model.search_read(domain, [reference_field_name]):
+                key = (record[reference_field_name] or '').lower()
+                if key in keys:
+                    index[key].append(record['id'])
+
+        return index
+
+    @api.model
+    def _is_mapping_key_resolved(self, key, index):
+        """
+        Whether external record with the key gets a mapping in the `map_external_records()`,
+        an empty one if nothing is found. Unresolved externals are skipped
+        """
+        return True
+
     @api.model
     def fix_unmapped(self, integration):
         # Method that should be overriden in needed external models
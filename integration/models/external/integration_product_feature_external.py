@@ -41,5 +41,9 @@ class IntegrationProductFeatureExternal(models.Model):
 
         odoo_model.create_or_update_mapping(self.integration_id, odoo_object, self)
 
+    def _get_mapping_key(self):
+        self.ensure_one()
+        return (self.name or '').lower() or None
+
     def run_import_features(self):
         return self._run_import_elements_element('feature')
@@ -74,6 +74,10 @@ class IntegrationProductPublicCategoryExternal(models.Model):
 
         odoo_model.create_or_update_mapping(self.integration_id, odoo_object, self)
 
+    def _get_mapping_key(self):
+        self.ensure_one()
+        return (self.name or '').lower() or None
+
     @api.model
     def fix_unmapped(self, integration):
         ProductPublicCategory = self.env['product.public.category']
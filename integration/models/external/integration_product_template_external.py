@@ -1,8 +1,8 @@
 # See LICENSE file for full copyright and licensing details.
 
 from ...exceptions import ApiImportError, NotMappedToExternal, NotMappedFromExternal
-from ...tools import IS_FALSE
-from odoo import models, fields, _
+from ...tools import IS_FALSE, ProductIndex
+from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 from odoo.tools.image import IMAGE_MAX_RESOLUTION
 from odoo.tools.sql import escape_psql
@@ -30,15 +30,20 @@ class IntegrationProductTemplateExternal(models.Model):
     )
 
     def run_import_products(self, import_images=False):
-        for external_template in self:
-            integration = external_template.integration_id
+        for integration in self.mapped('integration_id'):
+            external_templates = self.filtered(lambda x: x.integration_id == integration)
             integration = integration.with_context(company_id=integration.company_id.id)
+            limit = integration.get_import_product_batch_limit()
+
+            while external_templates:
+                integration.with_delay(
+                    description='Import Products Batch (auto-match + create Odoo products)'
+                ).import_products_batch(
+                    external_templates[:limit],
+                    import_images=import_images,
+                )
 
-            integration = integration.with_delay(
-                description='Import Single Product (auto-match + create Odoo product)'
-            )
-
-            integration.import_product(external_template, import_images=import_images)
+                external_templates = external_templates[limit:]
 
         plural = ('', 'is') if len(self) == 1 else ('s', 'are')
 
@@ -105,11 +110,18 @@ class IntegrationProductTemplateExternal(models.Model):
             raise_error=False,
         )
 
+        product_index = self.env.context.get('integration_product_index')
+
         # Then let's try to find Odoo template by internal reference
         if not odoo_template and tmpl_ref:
-            odoo_template = ProductTemplate.search([
-                ('default_code', '=ilike', escape_psql(tmpl_ref)),
-            ])
+            if product_index:
+                odoo_template = ProductTemplate.browse(
+                    product_index.find_templates('default_code', tmpl_ref)
+                )
+            else:
+                odoo_template = ProductTemplate.search([
+                    ('default_code', '=ilike', escape_psql(tmpl_ref)),
+                ])
 
             if len(odoo_template) > 1:
                 raise ApiImportError(_(
@@ -119,9 +131,14 @@ class IntegrationProductTemplateExternal(models.Model):
         # Now let's search product by barcode (as internal references may be different, but
         # barcodes usually unique
         if not odoo_template and tmpl_barcode:
-            odoo_template = ProductTemplate.search([
-                ('barcode', '=like', tmpl_barcode),
-            ])
+            if product_index:
+                odoo_template = ProductTemplate.browse(
+                    product_index.find_templates('barcode', tmpl_barcode)
+                )
+            else:
+                odoo_template = ProductTemplate.search([
+                    ('barcode', '=like', tmpl_barcode),
+                ])
 
             if len(odoo_template) > 1:
                 raise ApiImportError(_(
@@ -142,13 +159,13 @@ class IntegrationProductTemplateExternal(models.Model):
             product = self._find_product_by_field('default_code',
                                                   _('Internal Reference'),
                                                   '=ilike',
-                                                  escape_psql(variant_ref))
+                                                  variant_ref)
 
             if not product and variant_barcode:
                 product = self._find_product_by_field('barcode',
                                                       _('Barcode'),
                                                       '=like',
-                                                      escape_psql(variant_barcode))
+                                                      variant_barcode)
 
             if not product:
                 variants_templates_dict[variant_ref] = ProductTemplate
@@ -183,14 +200,59 @@ class IntegrationProductTemplateExternal(models.Model):
 
         return odoo_template
 
+    @api.model
+    def build_product_index(self, references, barcodes):
+        """
+        Index Odoo variants matching any of the references (case insensitive) or barcodes
+        together with all the variants of their templates. Used to auto-match a block of
+        imported products without searching every variant separately
+        """
+        ProductProduct = self.env['product.product']
+        product_index = ProductIndex()
+
+        references = list({x.lower() for x in references if x})
+        barcodes = list({x for x in barcodes if x})
+        if not references and not barcodes:
+            return product_index
+
+        ProductProduct.flush(['default_code', 'barcode'])
+        self.env.cr.execute(
+            'SELECT id FROM product_product '
+            'WHERE lower(default_code) = ANY(%s) OR barcode = ANY(%s)',
+            (references, barcodes),
+        )
+        # Search again to apply active flag and record rules
+        products = ProductProduct.search([('id', 'in', [x[0] for x in self.env.cr.fetchall()])])
+
+        variants = ProductProduct.search_read(
+            [('product_tmpl_id', 'in', products.mapped('product_tmpl_id').ids)],
+            ['product_tmpl_id', 'default_code', 'barcode'],
+        )
+        for variant in variants:
+            product_index.add(
+                variant['id'],
+                variant['product_tmpl_id'][0],
+                variant['default_code'],
+                variant['barcode'],
+            )
+
+        return product_index
+
     def _find_product_by_field(self,
                                field_technical_name,
                                field_friendly_name,
                                search_criteria,
                                value):
-        product = self.env['product.product'].search([
-            (field_technical_name, search_criteria, value),
-        ])
+        product_index = self.env.context.get('integration_product_index')
+
+        if product_index:
+            product = self.env['product.product'].browse(
+                product_index.find_products(field_technical_name, value)
+            )
+        else:
+            product = self.env['product.product'].search([
+                (field_technical_name, search_criteria, escape_psql(value)),
+            ])
 
         if len(product) > 1:
             raise ApiImportError(_(
@@ -202,8 +264,15 @@ class IntegrationProductTemplateExternal(models.Model):
         # as if not, we have chances that we will not be able to do auto-mapping properly
         if product:
             found_template = product.product_tmpl_id
-            for variant in found_template.product_variant_ids:
-                field_value = getattr(variant, field_technical_name)
+
+            if product_index:
+                field_values = product_index.get_template_values(
+                    found_template.id, field_technical_name,
+                )
+            else:
+                field_values = found_template.product_variant_ids.mapped(field_technical_name)
+
+            for field_value in field_values:
                 if not field_value:
                     raise ApiImportError(_('Not all product variants of the Product Template with'
                                            ' name "%s" (id=%s) has non-empty field "%s". Because '
@@ -13,15 +13,23 @@ class IntegrationResCountryStateExternal(models.Model):
     _inherit = 'integration.external.mixin'
     _description = 'Integration Res Country State External'
 
-    def _get_state_domain(self, code, integration):
-        state_domain = None
+    @staticmethod
+    def _split_state_reference(code):
         # States should have external reference like {countrycode_statecode}
         # for example, 'US_CA'
         if not code or '_' not in code:
-            return state_domain
+            return None
 
         cleaned_code = re.sub(r'\(.*?\)', '', code)  # for example 'PL_PLL-30(123)' --> skip (123)
-        country_code, state_code = cleaned_code.split('_')
+        return cleaned_code.split('_')
+
+    def _get_state_domain(self, code, integration):
+        state_domain = None
+        codes = self._split_state_reference(code)
+        if not codes:
+            return state_domain
+
+        country_code, state_code = codes
         external_country = self.env['integration.res.country.external'].search([
             ('integration_id', '=', integration.id),
             ('external_reference', '=', country_code),
@@ -53,6 +61,51 @@ class IntegrationResCountryStateExternal(models.Model):
             super(IntegrationResCountryStateExternal, self).\
                 try_map_by_external_reference(odoo_model, state_domain)
 
+    def _get_mapping_key(self):
+        self.ensure_one()
+        codes = self._split_state_reference(self.external_reference)
+        if not codes or len(codes) != 2:
+            return None
+
+        country_code, state_code = codes
+        return country_code, state_code.lower()
+
+    @api.model
+    def _get_odoo_mapping_index(self, integration, odoo_model, keys):
+        country_codes = list({country_code for country_code, __ in keys})
+
+        external_countries = self.env['integration.res.country.external'].search([
+            ('integration_id', '=', integration.id),
+            ('external_reference', 'in', country_codes),
+        ])
+        odoo_countries = self.env['integration.res.country.mapping'].to_odoo_bulk(
+            integration, external_countries.mapped('code'),
+        )
+        country_code_by_id = {
+            odoo_countries[x.code].id: x.external_reference
+            for x in external_countries if x.code in odoo_countries
+        }
+
+        # Keys of the mapped countries are resolved, even if no state is found for them
+        resolved_country_codes = set(country_code_by_id.values())
+        index = {x: [] for x in keys if x[0] in resolved_country_codes}
+
+        states = odoo_model.search_read(
+            [('country_id', 'in', list(country_code_by_id))],
+            ['country_id', 'code'],
+        )
+        for state in states:
+            key = (country_code_by_id[state['country_id'][0]], (state['code'] or '').lower())
+            if key in index:
+                index[key].append(state['id'])
+
+        return index
+
+    @api.model
+    def _is_mapping_key_resolved(self, key, index):
+        # States of the countries that are not mapped yet are skipped, not mapped empty
+        return key in index
+
     @api.model
     def fix_unmapped(self, integration):
         # odoo has bug (depending on the version) that they use incorrect ISO Codes fro below states
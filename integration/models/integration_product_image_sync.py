@@ -0,0 +1,210 @@
+# See LICENSE file for full copyright and licensing details.
+
+from collections import defaultdict
+
+from odoo import models, fields, api
+from odoo.osv import expression
+
+
+class IntegrationProductImageSync(models.Model):
+    _name = 'integration.product.image.sync'
+    _description = 'Integration Product Image Sync'
+
+    integration_id = fields.Many2one(
+        comodel_name='sale.integration',
+        required=True,
+        ondelete='cascade',
+    )
+    product_tmpl_id = fields.Many2one(
+        comodel_name='product.template',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    res_model = fields.Char(
+        required=True,
+    )
+    res_id = fields.Integer(
+        required=True,
+    )
+    res_field = fields.Char(
+        required=True,
+    )
+    checksum = fields.Char(
+        string='Checksum',
+        help='Checksum of the exported image content',
+    )
+    code = fields.Char(
+        string='External Image ID',
+        required=True,
+    )
+
+    _sql_constraints = [
+        (
+            'uniq_image',
+            'unique(integration_id, res_model, res_id, res_field)',
+            'Image should be synchronised only once per integration',
+        ),
+    ]
+
+    def _get_image_key(self):
+        self.ensure_one()
+        return self.res_model, self.res_id, self.res_field
+
+    @api.model
+    def get_images_checksums(self, image_keys):
+        """
+        Read checksums of the images from their attachments without loading the content.
+
+        :param image_keys: [(res_model, res_id, res_field), ...]
+        :return: {(res_model, res_id, res_field): checksum}
+        """
+        ids_by_model_field = defaultdict(set)
+        for res_model, res_id, res_field in image_keys:
+            ids_by_model_field[(res_model, res_field)].add(res_id)
+
+        if not ids_by_model_field:
+            return {}
+
+        domain = expression.OR([
+            [
+                ('res_model', '=', res_model),
+                ('res_field', '=', res_field),
+                ('res_id', 'in', list(res_ids)),
+            ]
+            for (res_model, res_field), res_ids in ids_by_model_field.items()
+        ])
+
+        attachments = self.env['ir.attachment'].sudo().search_read(
+            domain,
+            ['res_model', 'res_id', 'res_field', 'checksum'],
+        )
+
+        return {
+            (x['res_model'], x['res_id'], x['res_field']): x['checksum'] for x in attachments
+        }
+
+    @api.model
+    def read_image_source(self, image_key):
+        """
+        Return the path of the image in the filestore, so the content can be streamed
+        from disk by the adapter. Images stored in database are returned as base64.
+        """
+        res_model, res_id, res_field = image_key
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', res_model),
+            ('res_field', '=', res_field),
+            ('res_id', '=', res_id),
+        ], limit=1)
+
+        if attachment.store_fname:
+            return {'path': attachment._full_path(attachment.store_fname)}
+
+        return {'data': attachment.datas}
+
+    @api.model
+    def prepare_images_sync(self, integration, template, images_data, remote_codes):
+        """
+        Compare the images of the template with the ones exported before and decide
+        what has to be deleted and uploaded. Identical images are uploaded only once.
+
+        :return: {
+            'template': {...},
+            'images': [{'key': (res_model, res_id, res_field), 'checksum': '...'}, ...],
+            'keep': {checksum: external_image_id},
+            'delete': [external_image_id, ...],
+            'upload': [{'checksum': '...', 'path': <filestore path> or 'data': <base64>}, ...],
+        }
+        """
+        remote_codes = {str(x) for x in remote_codes}
+
+        images = []
+        for image_data in [images_data['template']] + images_data['products']:
+            if image_data['default']:
+                images.append(image_data['default'])
+            images.extend(image_data['extra'])
+
+        lines = self.search([
+            ('integration_id', '=', integration.id),
+            ('product_tmpl_id', '=', template.id),
+        ])
+        lines = lines.filtered(lambda x: x.code in remote_codes and x.checksum)
+
+        exported = {}
+        for line in lines:
+            exported.setdefault(line.checksum, line.code)
+
+        # The first uploaded image becomes the cover in the e-Commerce system.
+        # When the cover has changed all images are uploaded again to keep the order
+        cover = images and images[0]
+        if cover:
+            cover_line = lines.filtered(lambda x: x._get_image_key() == cover['key'])
+            if cover_line.checksum != cover['checksum']:
+                exported = {}
+
+        checksums = {x['checksum'] for x in images}
+        keep = {
+            checksum: code for checksum, code in exported.items() if checksum in checksums
+        }
+        delete = sorted(remote_codes - set(keep.values()))
+
+        upload = []
+        to_upload = set()
+        for image in images:
+            checksum = image['checksum']
+            if checksum in keep or checksum in to_upload:
+                continue
+
+            upload.append({
+                'checksum': checksum,
+                **self.read_image_source(image['key']),
+            })
+            to_upload.add(checksum)
+
+        return {
+            'template': images_data['template'],
+            'images': images,
+            'keep': keep,
+            'delete': delete,
+            'upload': upload,
+        }
+
+    @api.model
+    def save_images_sync(self, integration, template, sync_data, uploaded):
+        codes = {**sync_data['keep'], **uploaded}
+
+        lines = self.search([
+            ('integration_id', '=', integration.id),
+            ('product_tmpl_id', '=', template.id),
+        ])
+        lines_by_key = {x._get_image_key(): x for x in lines}
+
+        vals_list = []
+        for image in sync_data['images']:
+            code = codes.get(image['checksum'])
+            if not code:
+                continue
+
+            line = lines_by_key.pop(image['key'], None)
+            vals = {
+                'checksum': image['checksum'],
+                'code': code,
+            }
+
+            if not line:
+                res_model, res_id, res_field = image['key']
+                vals_list.append(dict(
+                    vals,
+                    integration_id=integration.id,
+                    product_tmpl_id=template.id,
+                    res_model=res_model,
+                    res_id=res_id,
+                    res_field=res_field,
+                ))
+            elif (line.checksum, line.code) != (vals['checksum'], vals['code']):
+                line.write(vals)
+
+        # Images removed from Odoo
+        self.browse([x.id for x in lines_by_key.values()]).unlink()
+
+        return self.create(vals_list)
@@ -0,0 +1,126 @@
+# See LICENSE file for full copyright and licensing details.
+
+from odoo import models, fields, api
+from odoo.tools import float_compare
+
+
+PRICE_FIELDS = ('price', 'wholesale_price')
+PRICE_PRECISION_DIGITS = 6
+
+
+class IntegrationProductPriceSync(models.Model):
+    _name = 'integration.product.price.sync'
+    _description = 'Integration Product Price Sync'
+
+    integration_id = fields.Many2one(
+        comodel_name='sale.integration',
+        required=True,
+        ondelete='cascade',
+    )
+    res_model = fields.Char(
+        required=True,
+    )
+    res_id = fields.Integer(
+        required=True,
+    )
+    code = fields.Char(
+        string='External ID',
+        required=True,
+    )
+    price = fields.Float(
+        string='Exported Price',
+        digits=(16, PRICE_PRECISION_DIGITS),
+    )
+    wholesale_price = fields.Float(
+        string='Exported Wholesale Price',
+        digits=(16, PRICE_PRECISION_DIGITS),
+    )
+    export_datetime = fields.Datetime(
+        string='Exported On',
+    )
+    sync_run = fields.Integer(
+        string='Prices Sync Run',
+        help='Number of the prices sync run that exported the price, empty for product export',
+    )
+
+    _sql_constraints = [
+        (
+            'uniq_price',
+            'unique(integration_id, res_model, res_id)',
+            'Price should be synchronised only once per integration',
+        ),
+    ]
+
+    @api.model
+    def get_exported_prices(self, integration):
+        """
+        :return: {(res_model, res_id): {'code': ..., 'price': ..., 'wholesale_price': ...}}
+        """
+        lines = self.search_read(
+            [('integration_id', '=', integration.id)],
+            ['res_model', 'res_id', 'code'] + list(PRICE_FIELDS),
+        )
+        return {(x.pop('res_model'), x.pop('res_id')): x for x in lines}
+
+    @api.model
+    def get_changed_prices(self, exported, prices):
+        """
+        Compare the prices prepared for export with the ones exported before.
+
+        :param exported: result of the `get_exported_prices()`
+        :param prices: [{'res_model': ..., 'res_id': ..., 'external_id': ..., 'price': ...}]
+        :return: items of `prices` that have to be exported again
+        """
+        changed = []
+        for price in prices:
+            previous = exported.get((price['res_model'], price['res_id']))
+            if not previous or previous['code'] != price['external_id']:
+                changed.append(price)
+                continue
+
+            is_changed = any(
+                float_compare(
+                    price[x] or 0.0,
+                    previous[x] or 0.0,
+                    precision_digits=PRICE_PRECISION_DIGITS,
+                )
+                for x in PRICE_FIELDS if x in price
+            )
+            if is_changed:
+                changed.append(price)
+
+        return changed
+
+    @api.model
+    def save_exported_prices(self, integration, prices, sync_run=False):
+        lines = self.search([
+            ('integration_id', '=', integration.id),
+            ('res_model', 'in', list({x['res_model'] for x in prices})),
+            ('res_id', 'in', list({x['res_id'] for x in prices})),
+        ])
+        lines_by_key = {(x.res_model, x.res_id): x for x in lines}
+        now = fields.Datetime.now()
+
+        vals_list = []
+        for price in prices:
+            vals = {
+                'code': price['external_id'],
+                'export_datetime': now,
+            }
+            if sync_run:
+                vals['sync_run'] = sync_run
+            vals.update((x, price[x] or 0.0) for x in PRICE_FIELDS if x in price)
+
+            line = lines_by_key.get((price['res_model'], price['res_id']))
+            if line:
+                line.write(vals)
+                continue
+
+            vals.update({
+                'integration_id': integration.id,
+                'res_model': price['res_model'],
+                'res_id': price['res_id'],
+            })
+            vals_list.append(vals)
+
+        return self.create(vals_list)
@@ -1,8 +1,9 @@
 # See LICENSE file for full copyright and licensing details.
 
-from ..exceptions import NotMappedFromExternal, ApiImportError
+from ..exceptions import ApiImportError
 
 import logging
+from collections import defaultdict
 
 from odoo import models, api, _
 from odoo.exceptions import UserError
@@ -11,11 +12,66 @@ from odoo.tools.float_utils import float_compare, float_is_zero, float_round
 
 _logger = logging.getLogger(__name__)
 
+PARTNER_LOOKUP_KEYS = [
+    ('res.country', 'country'),
+    ('res.country.state', 'state'),
+    ('res.lang', 'language'),
+]
+
 
 class IntegrationSaleOrderFactory(models.AbstractModel):
     _name = 'integration.sale.order.factory'
     _description = 'Integration Sale Order Factory'
 
+    @api.model
+    def _from_external(self, integration, model_name, code, raise_error=True):
+        """
+        Find Odoo record by external code. When orders are created in batch, found records
+        are kept in the lookup cache of the batch, so every code is searched only once
+        """
+        cache = self.env.context.get('integration_lookup_cache')
+        key = (model_name, integration.id, code)
+
+        if cache is not None and key in cache:
+            return cache[key]
+
+        record = self.env[model_name].from_external(integration, code, raise_error=raise_error)
+
+        if cache is not None and record:
+            cache[key] = record
+
+        return record
+
+    @api.model
+    def prefetch_partners(self, integration, orders_data):
+        """
+        Fill the lookup cache of the batch with partners, countries, states and languages
+        of all the orders addresses, one query per model
+        """
+        cache = self.env.context.get('integration_lookup_cache')
+        if cache is None:
+            return
+
+        codes = defaultdict(set)
+        for order_data in orders_data:
+            for partner_data in self._get_order_partners_data(order_data):
+                codes['res.partner'].add(partner_data['id'])
+
+                for model_name, key in PARTNER_LOOKUP_KEYS:
+                    if partner_data.get(key):
+                        codes[model_name].add(partner_data[key])
+
+        for model_name, model_codes in codes.items():
+            mapping_model = self.env[f'integration.{model_name}.mapping']
+            records = mapping_model.to_odoo_bulk(integration, model_codes)
+
+            for code, record in records.items():
+                cache[(model_name, integration.id, code)] = record
+
+    @api.model
+    def _get_order_partners_data(self, order_data):
+        return [order_data[x] for x in ('customer', 'shipping', 'billing') if order_data.get(x)]
+
     @api.model
     def create_order(self, integration, order_data):
         order = self.env['integration.sale.order.mapping'].search([
@@ -46,8 +102,8 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
             order.name += '/%s' % order_data['ref']
 
         if order_data['carrier']:
-            carrier = self.env['delivery.carrier'].from_external(
-                integration, order_data['carrier']
+            carrier = self._from_external(
+                integration, 'delivery.carrier', order_data['carrier']
             )
             order.set_delivery_line(carrier, order_data['shipping_cost'])
 
@@ -59,8 +115,8 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
                 delivery_tax_ids = self.env['account.tax']
 
                 for carrier_tax_id in carrier_tax_ids:
-                    delivery_tax_ids += self.env['account.tax'].from_external(
-                        integration, carrier_tax_id
+                    delivery_tax_ids += self._from_external(
+                        integration, 'account.tax', carrier_tax_id
                     )
 
                 delivery_line.tax_id = delivery_tax_ids
@@ -165,8 +221,8 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
     def _get_order_sub_status(self, integration, ext_current_state):
         SubStatus = self.env['sale.order.sub.status']
 
-        sub_status = SubStatus.from_external(
-            integration, ext_current_state, raise_error=False)
+        sub_status = self._from_external(
+            integration, SubStatus._name, ext_current_state, raise_error=False)
 
         if not sub_status:
             integration.integrationApiImportSaleOrderStatuses()
@@ -221,7 +277,8 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
 
         if order_data.get('customer'):
             customer = self._create_partner(integration, order_data['customer'])
-            customer.customer_rank = 1
+            if customer.customer_rank != 1:
+                customer.customer_rank = 1
 
         if order_data.get('shipping'):
             shipping = self._create_partner(integration, order_data['shipping'], 'delivery')
@@ -250,23 +307,20 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
 
     @api.model
     def _create_partner(self, integration, partner_data, address_type=None):
-        try:
-            partner = self.env['res.partner'].from_external(
-                integration, partner_data['id']
-            )
-        except NotMappedFromExternal:
-            partner = None
+        partner = self._from_external(
+            integration, 'res.partner', partner_data['id'], raise_error=False
+        )
 
         if partner_data.get('country'):
-            country = self.env['res.country'].from_external(
-                integration, partner_data.get('country')
+            country = self._from_external(
+                integration, 'res.country', partner_data.get('country')
             )
         else:
             country = self.env['res.country']
 
         if partner_data.get('state'):
-            state = self.env['res.country.state'].from_external(
-                integration, partner_data.get('state')
+            state = self._from_external(
+                integration, 'res.country.state', partner_data.get('state')
             )
         else:
             state = self.env['res.country.state']
@@ -286,8 +340,8 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
         }
 
         if partner_data.get('language'):
-            language = self.env['res.lang'].from_external(
-                integration, partner_data.get('language')
+            language = self._from_external(
+                integration, 'res.lang', partner_data.get('language')
             )
             if language:
                 vals.update({
@@ -316,7 +370,7 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
             })
 
         if partner:
-            partner.write(vals)
+            self._write_partner_changes(partner, vals)
         else:
             partner = self.env['res.partner'].create(vals)
             extra_vals = {'name': partner_data['person_name']}
@@ -325,10 +379,31 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
 
         return partner
 
+    @api.model
+    def _write_partner_changes(self, partner, vals):
+        """
+        Write only the values that differ from the current ones. Repeat customers mostly
+        come with the same data and a write would trigger needless syncs and recomputes
+        """
+        changed_vals = {}
+
+        for name, value in vals.items():
+            field = partner._fields[name]
+            cache_value = field.convert_to_cache(value, partner, validate=False)
+
+            if field.convert_to_record(cache_value, partner) != partner[name]:
+                changed_vals[name] = value
+
+        if changed_vals:
+            partner.write(changed_vals)
+
+        return changed_vals
+
     @api.model
     def _get_odoo_product(self, integration, variant_code, raise_error):
-        product = self.env['product.product'].from_external(
+        product = self._from_external(
             integration,
+            'product.product',
             variant_code,
             raise_error=False,
         )
@@ -352,6 +427,10 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
         if product:
             return product
 
+        # Missing products of the orders batch were already imported before creating orders
+        if self.env.context.get('integration_products_prefetched'):
+            return self._get_odoo_product(integration, variant_code, True)
+
         # Looks like this is new product in e-Commerce system
         # Or it is not fully mapped. In any case let's try to repeat mapping
         # for only this product and then try to find it again
@@ -379,8 +458,8 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
 
         if 'taxes' in line:
             for tax_id in line['taxes']:
-                taxes |= self.env['account.tax'].from_external(
-                    integration, tax_id
+                taxes |= self._from_external(
+                    integration, 'account.tax', tax_id
                 )
             vals.update(tax_id=[(6, 0, taxes.ids)])
 
@@ -565,8 +644,8 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
     def _get_payment_method(self, integration, ext_payment_method):
         PaymentMethod = self.env['sale.order.payment.method']
 
-        payment_method = PaymentMethod.from_external(
-            integration, ext_payment_method, raise_error=False)
+        payment_method = self._from_external(
+            integration, PaymentMethod._name, ext_payment_method, raise_error=False)
 
         if not payment_method:
             payment_method = PaymentMethod.search([
@@ -0,0 +1,184 @@
+#  See LICENSE file for full copyright and licensing details.
+
+import json
+import logging
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+
+_logger = logging.getLogger(__name__)
+
+WEBHOOK_EVENTS_BATCH = 500
+WEBHOOK_EVENTS_KEEP_DAYS = 7
+WEBHOOK_EVENT_ATTEMPTS = 5
+WEBHOOK_EVENT_RETRY_DELAY = timedelta(minutes=10)
+
+
+class IntegrationWebhookEvent(models.Model):
+    _name = 'integration.webhook.event'
+    _description = 'Integration Webhook Event'
+    _order = 'id'
+
+    integration_id = fields.Many2one(
+        comodel_name='sale.integration',
+        string='Integration',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    topic = fields.Char(
+        string='Topic',
+        required=True,
+    )
+    payload = fields.Text(
+        string='Payload',
+        required=True,
+    )
+    state = fields.Selection(
+        selection=[
+            ('pending', 'Pending'),
+            ('done', 'Done'),
+            ('skipped', 'Skipped'),
+            ('retry', 'Waiting for Retry'),
+            ('failed', 'Failed'),
+        ],
+        string='State',
+        default='pending',
+        required=True,
+        index=True,
+    )
+    error = fields.Text(
+        string='Error',
+    )
+    attempts = fields.Integer(
+        string='Attempts',
+        default=0,
+    )
+    retry_datetime = fields.Datetime(
+        string='Next Retry',
+    )
+
+    @api.model
+    def store_event(self, integration, topic, payload):
+        """
+        Save the webhook and trigger the consumer job. Called from the webhook controller,
+        so it must stay cheap: no processing is done here.
+        """
+        event = self.create({
+            'integration_id': integration.id,
+            'topic': topic,
+            'payload': json.dumps(payload),
+        })
+
+        integration._trigger_process_webhook_events()
+
+        return event
+
+    def to_dict(self):
+        self.ensure_one()
+        return json.loads(self.payload)
+
+    def process(self):
+        """
+        Apply events in bulk. When there are several events about the same record
+        only the latest one is applied, the older ones are skipped.
+        """
+        for integration in self.mapped('integration_id'):
+            events = self.filtered(lambda x: x.integration_id == integration)
+
+            latest_events = {}
+            for event in events:
+                key = integration._get_webhook_event_key(event.topic, event.to_dict())
+                latest_events[(event.topic, key)] = event
+
+            events_to_apply = self.browse([x.id for x in latest_events.values()])
+            events_to_apply -= events_to_apply._get_superseded_retries(integration)
+            (events - events_to_apply).write({'state': 'skipped'})
+
+            for topic in set(events_to_apply.mapped('topic')):
+                topic_events = events_to_apply.filtered(lambda x: x.topic == topic)
+                topic_events._apply(integration, topic)
+
+    def _get_superseded_retries(self, integration):
+        """
+        Retried events that are older than an already applied event about the same record.
+        Applying them again would overwrite the newer data
+        """
+        retries = self.filtered('attempts')
+        if not retries:
+            return retries
+
+        applied_events = self.search([
+            ('integration_id', '=', integration.id),
+            ('topic', 'in', retries.mapped('topic')),
+            ('state', '=', 'done'),
+            ('id', '>', min(retries.ids)),
+        ])
+        applied_ids = {}
+        for event in applied_events:
+            key = (event.topic, integration._get_webhook_event_key(event.topic, event.to_dict()))
+            applied_ids[key] = max(applied_ids.get(key, 0), event.id)
+
+        return retries.filtered(
+            lambda x: applied_ids.get(
+                (x.topic, integration._get_webhook_event_key(x.topic, x.to_dict())), 0,
+            ) > x.id
+        )
+
+    def _apply(self, integration, topic):
+        handler = getattr(integration, f'_webhook_{topic}', None)
+        if not handler:
+            self.write({
+                'state': 'failed',
+                'error': f'Webhook "{topic}" is not supported',
+            })
+            return
+
+        for event in self:
+            try:
+                with self.env.cr.savepoint():
+                    handler(event.to_dict())
+            except Exception as ex:
+                _logger.warning('Webhook event %s failed: %s', event.id, ex)
+                event._set_failed(str(ex))
+            else:
+                event.state = 'done'
+
+    def _set_failed(self, error):
+        """
+        Failed event is retried by the cron a few times with a growing delay,
+        it's failed for good only when all attempts are exhausted
+        """
+        for event in self:
+            attempts = event.attempts + 1
+            vals = {
+                'attempts': attempts,
+                'error': error,
+                'state': 'failed',
+            }
+            if attempts < WEBHOOK_EVENT_ATTEMPTS:
+                vals.update({
+                    'state': 'retry',
+                    'retry_datetime': fields.Datetime.now() + WEBHOOK_EVENT_RETRY_DELAY * attempts,
+                })
+            event.write(vals)
+
+    @api.model
+    def cron_retry_events(self):
+        events = self.search([
+            ('state', '=', 'retry'),
+            ('retry_datetime', '<=', fields.Datetime.now()),
+        ])
+        events.write({'state': 'pending'})
+
+        for integration in events.mapped('integration_id'):
+            integration._trigger_process_webhook_events()
+
+    @api.autovacuum
+    def _gc_processed_events(self):
+        date_limit = fields.Datetime.now() - timedelta(days=WEBHOOK_EVENTS_KEEP_DAYS)
+        self.search([
+            ('state', 'in', ('done', 'skipped')),
+            ('create_date', '<', date_limit),
+        ]).unlink()
@@ -1,6 +1,9 @@
 #  See LICENSE file for full copyright and licensing details.
 
-from odoo import models, fields
+from odoo import models, fields, api
+
+
+CACHED_FIELDS = {'technical_name', 'is_active', 'integration_id'}
 
 
 class IntegrationWebhookLine(models.Model):
@@ -42,6 +45,28 @@ class IntegrationWebhookLine(models.Model):
         compute='_compute_is_valid_base_url',
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        # Active topics are cached by `_get_webhook_verification_context()`
+        records.mapped('integration_id')._bump_settings_cache_version()
+        return records
+
+    def write(self, vals):
+        if not set(vals) & CACHED_FIELDS:
+            return super().write(vals)
+
+        integrations = self.mapped('integration_id')
+        res = super().write(vals)
+        (integrations | self.mapped('integration_id'))._bump_settings_cache_version()
+        return res
+
+    def unlink(self):
+        integrations = self.mapped('integration_id')
+        res = super().unlink()
+        integrations._bump_settings_cache_version()
+        return res
+
     def mute_line(self):
         for rec in self:
             value = rec.is_active
@@ -19,33 +19,29 @@ class IntegrationMappingMixin(models.AbstractModel):
         self.requeue_jobs_if_needed()
         return result
 
-    @api.model
-    def create(self, vals):
-        result = super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        result = super().create(vals_list)
         result.requeue_jobs_if_needed()
         return result
 
     def requeue_jobs_if_needed(self):
         QueueJob = self.env['queue.job']
+        internal_field_name, external_field_name = self._mapping_fields
 
-        for mapping in self:
-            internal_field_name, external_field_name = self._mapping_fields
+        external_codes = []
+        internal_ids = []
 
+        for mapping in self:
             internal_rec = getattr(mapping, internal_field_name)
             external_rec = getattr(mapping, external_field_name)
 
             if internal_rec and external_rec:
-                QueueJob.requeue_integration_jobs(
-                    'NotMappedFromExternal',
-                    mapping._name,
-                    external_rec.code,
-                )
-
-                QueueJob.requeue_integration_jobs(
-                    'NotMappedToExternal',
-                    self._name,
-                    str(internal_rec.id),
-                )
+                external_codes.append(external_rec.code)
+                internal_ids.append(str(internal_rec.id))
+
+        QueueJob.requeue_integration_jobs('NotMappedFromExternal', self._name, external_codes)
+        QueueJob.requeue_integration_jobs('NotMappedToExternal', self._name, internal_ids)
 
     @property
     def external_model(self):
@@ -101,6 +97,49 @@ class IntegrationMappingMixin(models.AbstractModel):
 
         return mapping
 
+    @api.model
+    def create_integration_mappings(self, integration, odoo_values, codes, extra_vals_list):
+        """
+        Batch version of the `create_integration_mapping()` for just exported records.
+        External records and mappings are created with one call each
+        """
+        internal_field_name, external_field_name = self._mapping_fields
+        codes = [str(x) for x in codes]
+
+        existing_externals = self.external_model.search([
+            ('integration_id', '=', integration.id),
+            ('code', 'in', codes),
+        ])
+        externals_by_code = {x.code: x for x in existing_externals}
+
+        new_vals_list = []
+        for odoo_value, code, extra_vals in zip(odoo_values, codes, extra_vals_list):
+            external_vals = self._retrieve_external_vals(integration, odoo_value, code)
+            external_vals.update(extra_vals)
+
+            if code in externals_by_code:
+                externals_by_code[code].write(external_vals)
+            else:
+                new_vals_list.append(external_vals)
+
+        for external in self.external_model.create(new_vals_list):
+            externals_by_code[external.code] = external
+
+        mapped_externals = self.search([
+            ('integration_id', '=', integration.id),
+            (external_field_name, 'in', existing_externals.ids),
+        ]).mapped(external_field_name)
+
+        return self.create([
+            {
+                'integration_id': integration.id,
+                internal_field_name: odoo_value.id,
+                external_field_name: externals_by_code[code].id,
+            }
+            for odoo_value, code in zip(odoo_values, codes)
+            if externals_by_code[code] not in mapped_externals
+        ])
+
     @api.model
     def create_or_update_mapping(self, integration, odoo_object, external_object):
         odoo_object_id = False
@@ -153,6 +192,27 @@ class IntegrationMappingMixin(models.AbstractModel):
         mapping = self.get_mapping(integration, code)
         return self._get_internal_record(mapping, integration, code, raise_error)
 
+    @api.model
+    def to_odoo_bulk(self, integration, codes):
+        """
+        Find Odoo records for several external codes in one query.
+        Return {code: record} only for the mapped codes
+        """
+        internal_field_name, external_field_name = self._mapping_fields
+
+        mappings = self.search([
+            ('integration_id', '=', integration.id),
+            (f'{external_field_name}.code', 'in', list(codes)),
+        ])
+
+        result = {}
+        for mapping in mappings:
+            record = mapping[internal_field_name]
+            if record:
+                result[mapping[external_field_name].code] = record
+
+        return result
+
     @api.model
     def to_odoo_from_name(self, integration, name, raise_error=True):
         mapping = self.get_mapping_from_name(integration, name)
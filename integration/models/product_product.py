@@ -128,9 +128,10 @@ class ProductProduct(models.Model):
 
         search_domain = self._variant_ecommerce_field_domain(integration, product_external_code)
 
-        for field in self.env['product.ecommerce.field.mapping'].\
-                search(search_domain).mapped('ecommerce_field_id'):
-            result[field.technical_name] = integration.calculate_field_value(self, field)
+        ecommerce_fields = self.env['product.ecommerce.field.mapping'].\
+            search(search_domain).mapped('ecommerce_field_id')
+        fields_values = integration.calculate_fields_values(self, ecommerce_fields)
+        result.update(fields_values[self.id])
 
         return result
 
@@ -1,6 +1,5 @@
 # See LICENSE file for full copyright and licensing details.
 
-from ..tools import _guess_mimetype
 from .template_converter import TemplateConverter
 from odoo.exceptions import ValidationError, UserError
 from odoo import models, fields, api, _
@@ -378,6 +377,20 @@ class ProductTemplate(models.Model):
             )
             products_images_data.append(image_data)
 
+        # Checksums are taken from the attachments with a single query. Image content
+        # is loaded later only for the images that really have to be uploaded
+        images_data_list = [template_images_data] + products_images_data
+        checksums = self.env['integration.product.image.sync'].get_images_checksums(
+            [x['key'] for data in images_data_list for x in [data['default']] + data['extra']]
+        )
+
+        for images_data in images_data_list:
+            for image in [images_data['default']] + images_data['extra']:
+                image['checksum'] = checksums.get(image['key'])
+
+            if not images_data['default']['checksum']:
+                images_data['default'] = None
+
         result = {
             'template': template_images_data,
             'products': products_images_data,
@@ -393,20 +406,14 @@ class ProductTemplate(models.Model):
             extra_images = record.product_variant_image_ids
             default_image_field = 'image_variant_1920'
 
-        default_image_data = record[default_image_field]
-        if default_image_data:
-            default_image = {
-                'data': default_image_data,
-                'mimetype': _guess_mimetype(default_image_data),
-            }
-        else:
-            default_image = None
+        default_image = {
+            'key': (record._name, record.id, default_image_field),
+        }
 
         extra_images_data = []
         for extra_image in extra_images:
             extra_image_data = {
-                'data': extra_image.image_1920,
-                'mimetype': _guess_mimetype(extra_image.image_1920)
+                'key': (extra_image._name, extra_image.id, 'image_1920'),
             }
             extra_images_data.append(extra_image_data)
 
@@ -84,11 +84,15 @@ class QueueJob(models.Model):
 
     @api.model
     def requeue_integration_jobs(self, exception_name, model_name, key):
+        keys = key if isinstance(key, list) else [key]
+        if not keys:
+            return
+
         jobs = self.sudo().search([
             ('state', '=', FAILED),
             ('integration_exception_name', '=', exception_name),
             ('integration_model_name', '=', model_name),
-            ('integration_key', '=', key),
+            ('integration_key', 'in', keys),
         ])
 
         if jobs:
@@ -4,12 +4,15 @@ import json
 import logging
 import traceback
 from io import StringIO
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from cerberus import Validator
 
 from ..api.no_api import NoAPIClient
-from odoo.tools import config
+from ..tools import LookupCache
+from .integration_webhook_event import WEBHOOK_EVENTS_BATCH
+from .integration_product_price_sync import PRICE_FIELDS
+from odoo.tools import config, frozendict, ormcache
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
 import odoo.release as release
@@ -20,6 +23,24 @@ MAPPING_EXCEPT_LIST = [
 ]
 LOG_SEPARATOR = '================================'
 IMPORT_EXTERNAL_BLOCK = 500  # Don't make more, because of 414 Request-URI Too Large error
+IMPORT_PRODUCT_BATCH = 50
+PRODUCT_SYNC_OVERLAP = timedelta(minutes=10)
+PRODUCT_DELETION_CHECK_INTERVAL = timedelta(days=1)
+RECEIVE_ORDERS_SAFETY_NET_INTERVAL = timedelta(hours=1)
+PRODUCT_VALIDATION_CACHE_TTL = timedelta(minutes=30)
+CREATE_ORDER_BATCH = 20
+PRICE_COMPUTE_BLOCK = 1000
+PRICE_EXPORT_BATCH = 200
+# {kind: (parent code key in export format, parent external model, field to link parent)}
+EXPORT_PARENT_FIELDS = {
+    'attribute_values': (
+        'attribute', 'integration.product.attribute.external', 'external_attribute_id',
+    ),
+    'feature_values': (
+        'feature_id', 'integration.product.feature.external', 'external_feature_id',
+    ),
+}
+CACHED_FIELDS = {'name', 'type_api', 'field_ids', 'webhook_line_ids'}
 DEFAULT_LOG_LABEL = 'Sale Integration Webhook'
 
 _logger = logging.getLogger(__name__)
@@ -94,6 +115,44 @@ class SaleIntegration(models.Model):
     export_sale_order_status_job_enabled = fields.Boolean(
         default=False,
     )
+    import_product_sync_job_enabled = fields.Boolean(
+        string='Incremental Product Sync Job Enabled',
+        default=False,
+        help='Periodically import products that were changed in the e-Commerce system',
+    )
+    last_product_sync_datetime = fields.Datetime(
+        copy=False,
+    )
+    last_product_deletion_check_datetime = fields.Datetime(
+        copy=False,
+    )
+    last_product_validation_datetime = fields.Datetime(
+        string='Last Successful Products Validation',
+        copy=False,
+    )
+    settings_cache_version = fields.Integer(
+        default=0,
+        copy=False,
+        readonly=True,
+    )
+    export_prices_job_enabled = fields.Boolean(
+        string='Prices Sync Job Enabled',
+        default=False,
+        help='Periodically export prices that were changed in Odoo since the last export',
+    )
+    last_price_sync_datetime = fields.Datetime(
+        copy=False,
+    )
+    price_sync_total = fields.Integer(
+        copy=False,
+    )
+    price_sync_run = fields.Integer(
+        copy=False,
+    )
+    price_sync_progress = fields.Char(
+        string='Prices Sync Progress',
+        compute='_compute_price_sync_progress',
+    )
     product_ids = fields.Many2many(
         'product.template', 'sale_integration_product', 'sale_integration_id', 'product_id',
         'Products',
@@ -220,6 +279,62 @@ class SaleIntegration(models.Model):
             'target': 'current',
         }
 
+    def open_webhook_events(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Integration Webhook Events',
+            'res_model': 'integration.webhook.event',
+            'view_mode': 'tree,form',
+            'domain': [('integration_id', '=', self.id)],
+            'target': 'current',
+        }
+
+    @ormcache('self.id', 'self.settings_cache_version')
+    def _get_webhook_verification_context(self):
+        """
+        Everything that is needed to verify incoming webhook. Cached, so webhook controllers
+        neither read the settings nor build the adapter on every call
+        """
+        integration = self.sudo()
+        settings = {x.name: x.value for x in integration.field_ids}
+        active_lines = integration.webhook_line_ids.filtered('is_active')
+
+        return frozendict({
+            'name': integration.name,
+            'type_api': integration.type_api,
+            'url': settings.get('url') or '',
+            'key': settings.get('key') or '',
+            'has_webhooks': bool(integration.webhook_line_ids),
+            'active_topics': frozenset(active_lines.mapped('technical_name')),
+        })
+
+    def process_webhook_events(self):
+        self.ensure_one()
+
+        events = self.env['integration.webhook.event'].search([
+            ('integration_id', '=', self.id),
+            ('state', '=', 'pending'),
+        ], limit=WEBHOOK_EVENTS_BATCH)
+
+        events.process()
+
+        # Process the rest of events in the next job
+        if len(events) == WEBHOOK_EVENTS_BATCH:
+            self._trigger_process_webhook_events()
+
+    def _trigger_process_webhook_events(self):
+        integration = self.with_context(company_id=self.company_id.id)
+        return integration.with_delay(
+            identity_key=f'process_webhook_events_{self.id}',
+            description='Process Webhook Events',
+        ).process_webhook_events()
+
+    def _get_webhook_event_key(self, topic, payload):
+        """
+        Events with the same key are considered as repeated and only the latest one is applied
+        """
+        return json.dumps(payload, sort_keys=True)
+
     def create_webhooks(self, raise_original=False):
         self.ensure_one()
         routes_dict = self.prepare_webhook_routes()
@@ -432,11 +547,29 @@ class SaleIntegration(models.Model):
     def write(self, vals):
         self.ensure_one()
         res = super().write(vals)
+        if set(vals) & CACHED_FIELDS:
+            self._bump_settings_cache_version()
         ctx = self.env.context.copy()
         if not ctx.get('write_settings_fields'):
             res = self.write_settings_fields(vals)
         return res
 
+    def _bump_settings_cache_version(self):
+        """
+        Cached settings snapshot and webhook verification context are keyed on this counter.
+        Bumping it makes them to be rebuilt on every worker without flushing the registry cache
+        """
+        if not self.ids:
+            return
+
+        self.env.cr.execute(
+            'UPDATE sale_integration '
+            'SET settings_cache_version = COALESCE(settings_cache_version, 0) + 1 '
+            'WHERE id IN %s',
+            (tuple(self.ids),),
+        )
+        self.invalidate_cache(fnames=['settings_cache_version'], ids=self.ids)
+
     def create_fields_mapping_for_integration(self):
         ecommerce_fields = self.env['product.ecommerce.field']\
             .search([('type_api', '=', self.type_api), ('is_default', '=', True)])
@@ -459,7 +592,7 @@ class SaleIntegration(models.Model):
             settings_fields = self.get_default_settings_fields()
 
         if settings_fields is not None and settings_fields:
-            exists_fields = self.field_ids.to_dictionary()
+            exists_fields = set(self.field_ids.mapped('name'))
             settings_fields = self.convert_settings_fields(settings_fields)
             fields_list_to_add = [
                 (0, 0, {
@@ -482,6 +615,12 @@ class SaleIntegration(models.Model):
 
         return res
 
+    @api.model
+    def _backfill_settings_fields(self):
+        """Add settings fields introduced by module updates. Called on install and upgrade."""
+        for integration in self.search([]):
+            integration.write_settings_fields({})
+
     def get_settings_value(self, key):
         self.ensure_one()
         field = self.get_settings_field(key)
@@ -539,6 +678,10 @@ class SaleIntegration(models.Model):
     def get_external_block_limit():
         return IMPORT_EXTERNAL_BLOCK
 
+    @staticmethod
+    def get_import_product_batch_limit():
+        return IMPORT_PRODUCT_BATCH
+
     @api.model
     def get_default_settings_fields(self, type_api=None):
         return getattr(self.get_class(), 'settings_fields')
@@ -858,6 +1001,73 @@ class SaleIntegration(models.Model):
 
             template_ids = template_ids[limit:]
 
+    @api.model
+    def cron_sync_products(self):
+        for integration in self.get_integrations('import_product_sync', None):
+            integration.with_context(company_id=integration.company_id.id).with_delay(
+                identity_key=f'sync_products_{integration.id}',
+                description='Incremental Products Sync: Find Changed Products',
+            ).integrationApiSyncProducts()
+
+    def integrationApiSyncProducts(self):
+        """
+        Import products changed in the e-Commerce system since the previous run.
+        Deleted products are found periodically by comparing the sets of ids,
+        as the e-Commerce system doesn't report deletions.
+        """
+        self.ensure_one()
+        sync_datetime = fields.Datetime.now()
+
+        # The first run only sets the starting point. All the products are expected
+        # to be imported already with the initial import
+        if not self.last_product_sync_datetime:
+            self.last_product_sync_datetime = sync_datetime
+            return
+
+        limit = self.get_external_block_limit()
+        adapter = self._build_adapter()
+        template_ids = adapter.get_updated_product_template_ids(
+            self.last_product_sync_datetime - PRODUCT_SYNC_OVERLAP,
+        )
+
+        while template_ids:
+            self.with_context(company_id=self.company_id.id).with_delay(
+                description='Incremental Products Sync: Import Products Batch'
+            ).sync_external_products(template_ids[:limit])
+
+            template_ids = template_ids[limit:]
+
+        last_check = self.last_product_deletion_check_datetime
+        if not last_check or last_check + PRODUCT_DELETION_CHECK_INTERVAL <= sync_datetime:
+            self._remove_deleted_external_products(adapter)
+            self.last_product_deletion_check_datetime = sync_datetime
+
+        self.last_product_sync_datetime = sync_datetime
+
+    def sync_external_products(self, template_ids):
+        external_templates, __ = self.import_external_product(template_ids)
+        return external_templates.run_import_products(import_images=False)
+
+    def _remove_deleted_external_products(self, adapter):
+        remote_ids = set(str(x) for x in adapter.get_all_product_template_ids())
+
+        # Empty answer is rather a problem on the e-Commerce system side
+        if not remote_ids:
+            return
+
+        external_templates = self.env['integration.product.template.external'].search([
+            ('integration_id', '=', self.id),
+        ])
+        deleted_templates = external_templates.filtered(lambda x: x.code not in remote_ids)
+
+        if deleted_templates:
+            _logger.info(
+                'Incremental Products Sync: %s products were deleted in %s',
+                len(deleted_templates),
+                self.name,
+            )
+            deleted_templates.unlink()
+
     def integrationApiImportSaleOrderStatuses(self):
         external_records = self._import_external(
             'integration.sale.order.sub.status.external',
@@ -900,6 +1110,16 @@ class SaleIntegration(models.Model):
         external_templates = ExternalTemplate
         external_variants = ExternalVariant
 
+        references, barcodes = [], []
+        for ext_template in ext_templates.values():
+            for ext_record in [ext_template, *ext_template.get('variants', [])]:
+                references.append(ext_record.get('external_reference'))
+                barcodes.append(ext_record.get('barcode'))
+
+        ExternalTemplate = ExternalTemplate.with_context(
+            integration_product_index=ExternalTemplate.build_product_index(references, barcodes),
+        )
+
         for ext_template in ext_templates.values():
             external_template = self._import_external_record(ExternalTemplate, ext_template)
             external_templates |= external_template
@@ -950,11 +1170,7 @@ class SaleIntegration(models.Model):
 
     def _map_external(self, odoo_model_name):
         external_model = self.env[f'integration.{odoo_model_name}.external']
-        all_external_records = external_model.search([
-            ('integration_id', '=', self.id)
-        ])
-        for external_record in all_external_records:
-            external_record.try_map_by_external_reference(self.env[odoo_model_name])
+        external_model.map_external_records(self, self.env[odoo_model_name])
         external_model.fix_unmapped(self)
 
     def export_template(self, template, *, export_images=False):
@@ -966,6 +1182,10 @@ class SaleIntegration(models.Model):
         # First validate if product template is ready to be exported
         template.validate_in_odoo(self)
 
+        # Unmapped attributes and features are exported in bulk beforehand,
+        # otherwise template converter exports them one by one
+        self.export_product_dependencies(template)
+
         template_for_export = template.to_export_format(self)
         # Now let's validate template in external system
         # In case we will be returned with external records to delete
@@ -1040,6 +1260,8 @@ class SaleIntegration(models.Model):
                 'external_product_template_id': external_product_template.id,
             })
 
+        self._save_exported_template_prices(template_for_export, adapter_mappings)
+
         results_list.append(
             _('SUCCESS! Product Template "%s" was exported successfully. Product Template Code in '
               'external system is %s') % (template.name, external_product_template.code)
@@ -1121,28 +1343,136 @@ class SaleIntegration(models.Model):
             )
         return custom_python_method(self)
 
+    def calculate_fields_values(self, records, ecommerce_fields):
+        """
+        Batched version of calculate_field_value(). Translatable fields are read
+        for all records and languages at once, other converters are called per record.
+
+        :return: {record_id: {technical_name: value}}
+        """
+        self.ensure_one()
+        translatable_fields = ecommerce_fields.filtered(
+            lambda x: x.value_converter == 'translatable_field'
+        )
+        translations = self.convert_translated_fields_to_integration_format(
+            records,
+            translatable_fields.mapped('odoo_field_id.name'),
+        )
+
+        result = {}
+        for record in records:
+            values = result[record.id] = {}
+
+            for field in ecommerce_fields:
+                if field in translatable_fields:
+                    value = translations[record.id][field.odoo_field_id.name]
+                else:
+                    value = self.calculate_field_value(record, field)
+
+                values[field.technical_name] = value
+
+        return result
+
     def convert_translated_field_to_integration_format(self, record, field):
         self.ensure_one()
+        translations = self.convert_translated_fields_to_integration_format(record, [field])
+        return translations.get(record.id, {}).get(field, {})
+
+    def convert_translated_fields_to_integration_format(self, records, field_names):
+        """
+        Read the values of the translatable fields for all records in all mapped languages.
+        Stored fields are fetched with a single query per field.
+
+        :return: {record_id: {field_name: {external_language_code: value}}}
+        """
+        self.ensure_one()
 
         language_mappings = self.env['integration.res.lang.mapping'].search([
             ('integration_id', '=', self.id)
         ])
+        languages = [
+            (x.language_id.code, x.external_language_id.code) for x in language_mappings
+        ]
+
+        result = {record.id: {name: {} for name in field_names} for record in records}
+        if not records or not languages:
+            return result
+
+        records.flush(field_names, records)
+        self.env['ir.translation'].flush()
+
+        lang_codes = list({lang_code for lang_code, __ in languages if lang_code})
+
+        for field_name in field_names:
+            field = records._fields[field_name]
+
+            # Computed and term-based (html / xml) translations are resolved by the ORM
+            if not field.store or field.translate is not True:
+                for lang_code, external_code in languages:
+                    for record in records.with_context(lang=lang_code):
+                        result[record.id][field_name][external_code] = record[field_name]
+                continue
 
-        translations = {}
-        for language_mapping in language_mappings:
-            external_code = language_mapping.external_language_id.code
-            translations[external_code] = getattr(
-                record.with_context(lang=language_mapping.language_id.code),
-                field,
+            field_translations = self._read_field_translations(records, field, lang_codes)
+
+            for record_id, (source, translated) in field_translations.items():
+                for lang_code, external_code in languages:
+                    result[record_id][field_name][external_code] = translated.get(
+                        lang_code, source,
+                    )
+
+        return result
+
+    def _read_field_translations(self, records, field, lang_codes):
+        """
+        :return: {record_id: (source_value, {lang_code: translated_value})}
+        """
+        query = """
+            SELECT rec.id, rec."{column}", tr.lang, tr.value
+            FROM "{table}" rec
+            LEFT JOIN ir_translation tr
+                ON tr.res_id = rec.id
+                AND tr.type = 'model'
+                AND tr.name = %s
+                AND tr.lang = ANY(%s)
+                AND tr.value != ''
+            WHERE rec.id = ANY(%s)
+        """.format(table=records._table, column=field.name)
+        translation_name = '%s,%s' % (records._name, field.name)
+
+        def _convert(value):
+            return field.convert_to_record(
+                field.convert_to_cache(value, records, validate=False),
+                records,
             )
 
-        return translations
+        result = {}
+        for sub_ids in self.env.cr.split_for_in_conditions(records.ids):
+            self.env.cr.execute(query, (translation_name, lang_codes, list(sub_ids)))
+
+            for record_id, source, lang_code, value in self.env.cr.fetchall():
+                __, translated = result.setdefault(record_id, (_convert(source), {}))
+                if lang_code:
+                    translated[lang_code] = _convert(value)
+
+        return result
 
     def export_images(self, template):
         self.ensure_one()
         adapter = self._build_adapter()
+        ImageSync = self.env['integration.product.image.sync']
+
         export_images_data = template.to_images_export_format(self)
-        adapter.export_images(export_images_data)
+        remote_codes = adapter.get_product_image_ids(export_images_data['template']['id'])
+
+        sync_data = ImageSync.prepare_images_sync(
+            self,
+            template,
+            export_images_data,
+            remote_codes,
+        )
+        uploaded = adapter.export_images(sync_data)
+        ImageSync.save_images_sync(self, template, sync_data, uploaded)
 
     def get_inventory(self, templates):
         inventory = {}
@@ -1183,6 +1513,216 @@ class SaleIntegration(models.Model):
             ['free_qty'], templates.product_variant_ids.ids
         )
 
+    @api.depends('price_sync_run', 'price_sync_total')
+    def _compute_price_sync_progress(self):
+        PriceSync = self.env['integration.product.price.sync']
+        for integration in self:
+            if not integration.price_sync_run:
+                integration.price_sync_progress = False
+                continue
+
+            # Prices saved by the product export don't belong to the sync run
+            done = PriceSync.search_count([
+                ('integration_id', '=', integration.id),
+                ('sync_run', '=', integration.price_sync_run),
+            ])
+            total = integration.price_sync_total
+            integration.price_sync_progress = _('%s / %s prices exported') % (
+                min(done, total), total,
+            )
+
+    @api.model
+    def cron_sync_prices(self):
+        for integration in self.get_integrations('export_prices', None):
+            if integration._is_price_export_supported():
+                integration._trigger_sync_prices()
+
+    def _is_price_export_supported(self):
+        """
+        Whether adapter implements `export_prices()`. To be redefined in the connectors
+        """
+        return False
+
+    def action_sync_prices(self):
+        self.ensure_one()
+        if not self._is_price_export_supported():
+            raise UserError(_('Prices sync is not supported by "%s" integration') % self.name)
+
+        self._trigger_sync_prices()
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Prices Sync'),
+                'message': 'Queue Job "Prices Sync" is created',
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def _trigger_sync_prices(self):
+        self.ensure_one()
+        self.with_context(company_id=self.company_id.id).with_delay(
+            identity_key=f'sync_prices_{self.id}',
+            description='Prices Sync: Find Changed Prices',
+        ).integrationApiSyncPrices()
+
+    def integrationApiSyncPrices(self):
+        """
+        Compute export prices of all mapped templates and variants, compare them
+        with the last exported ones and queue export of the changed prices in batches.
+        """
+        self.ensure_one()
+        PriceSync = self.env['integration.product.price.sync']
+
+        prices = self._get_export_prices()
+        changed_prices = PriceSync.get_changed_prices(
+            PriceSync.get_exported_prices(self),
+            prices,
+        )
+
+        # Prices are saved only after the export, so until the batch is done the next
+        # run finds the same changes. Prices that are already queued are not queued again
+        queued_keys = self._get_queued_price_keys()
+        changed_prices = sorted(
+            (x for x in changed_prices if (x['res_model'], x['res_id']) not in queued_keys),
+            key=lambda x: (x['res_model'], x['res_id']),
+        )
+
+        sync_run = self.price_sync_run + 1
+        self.write({
+            'last_price_sync_datetime': fields.Datetime.now(),
+            'price_sync_total': len(changed_prices),
+            'price_sync_run': sync_run,
+        })
+
+        integration = self.with_context(company_id=self.company_id.id)
+        for index in range(0, len(changed_prices), PRICE_EXPORT_BATCH):
+            batch = changed_prices[index:index + PRICE_EXPORT_BATCH]
+            first, last = batch[0], batch[-1]
+            integration.with_delay(
+                identity_key=(
+                    f'export_prices_{self.id}_{first["res_model"]}_{first["res_id"]}'
+                    f'_{last["res_model"]}_{last["res_id"]}'
+                ),
+                description='Prices Sync: Export Prices Batch',
+            ).export_prices_batch(batch, sync_run=sync_run)
+
+        return _('Prices to export: %s of %s') % (len(changed_prices), len(prices))
+
+    def export_prices_batch(self, prices, sync_run=False):
+        self.ensure_one()
+
+        adapter = self._build_adapter()
+        adapter.export_prices(prices)
+
+        self.env['integration.product.price.sync'].save_exported_prices(
+            self, prices, sync_run=sync_run,
+        )
+        return _('Exported prices: %s') % len(prices)
+
+    def _get_queued_price_keys(self):
+        """
+        Return {(res_model, res_id)} of the prices queued for export, but not exported yet
+        """
+        self.ensure_one()
+        jobs = self.env['queue.job'].sudo().search([
+            ('model_name', '=', 'sale.integration'),
+            ('method_name', '=', 'export_prices_batch'),
+            ('func_string', 'like', f'{self._name}({self.id},)'),
+            ('state', 'in', ('pending', 'enqueued', 'started')),
+        ])
+        return {(x['res_model'], x['res_id']) for job in jobs for x in job.args[0]}
+
+    def _get_export_prices(self):
+        """
+        :return: [{'res_model': ..., 'res_id': ..., 'external_id': ..., <price fields>}]
+        """
+        self.ensure_one()
+        result = []
+
+        for res_model, mapping_model, odoo_field, external_field in (
+            (
+                'product.template',
+                'integration.product.template.mapping',
+                'template_id',
+                'external_template_id',
+            ),
+            (
+                'product.product',
+                'integration.product.product.mapping',
+                'product_id',
+                'external_product_id',
+            ),
+        ):
+            ecommerce_fields = self._get_price_ecommerce_fields(res_model)
+            if not ecommerce_fields:
+                continue
+
+            mappings = self.env[mapping_model].search([
+                ('integration_id', '=', self.id),
+                (odoo_field, '!=', False),
+                (external_field, '!=', False),
+            ])
+            codes = {x[odoo_field].id: x[external_field].code for x in mappings}
+
+            record_ids = list(codes)
+            Model = self.env[res_model].with_context(active_test=False)
+            for index in range(0, len(record_ids), PRICE_COMPUTE_BLOCK):
+                records = Model.browse(record_ids[index:index + PRICE_COMPUTE_BLOCK])
+                fields_values = self.calculate_fields_values(records, ecommerce_fields)
+
+                for record_id, values in fields_values.items():
+                    result.append(dict(
+                        values,
+                        res_model=res_model,
+                        res_id=record_id,
+                        external_id=codes[record_id],
+                    ))
+
+        return result
+
+    def _get_price_ecommerce_fields(self, res_model):
+        Model = self.env[res_model]
+        if res_model == 'product.template':
+            domain = Model._template_ecommerce_field_domain(self, True)
+        else:
+            domain = Model._variant_ecommerce_field_domain(self, True)
+
+        domain.append(('technical_name', 'in', list(PRICE_FIELDS)))
+        return self.env['product.ecommerce.field.mapping'].search(domain).mapped(
+            'ecommerce_field_id'
+        )
+
+    def _save_exported_template_prices(self, template_data, adapter_mappings):
+        """
+        Remember prices sent with the template, so the next prices sync doesn't
+        export them again
+        """
+        values_by_key = {('product.template', template_data['id']): template_data}
+        values_by_key.update(
+            (('product.product', x['id']), x) for x in template_data['products']
+        )
+
+        prices = []
+        for adapter_mapping in adapter_mappings:
+            key = (adapter_mapping['model'], adapter_mapping['id'])
+            values = values_by_key.get(key, {})
+            price = {x: values[x] for x in PRICE_FIELDS if x in values}
+            if not price:
+                continue
+
+            price.update(
+                res_model=key[0],
+                res_id=key[1],
+                external_id=str(adapter_mapping['external_id']),
+            )
+            prices.append(price)
+
+        if prices:
+            self.env['integration.product.price.sync'].save_exported_prices(self, prices)
+
     def export_inventory(self, templates):
         self.ensure_one()
 
@@ -1260,6 +1800,73 @@ class SaleIntegration(models.Model):
 
         return attribute_value_code
 
+    def export_product_dependencies(self, templates):
+        """
+        Export all attributes, attribute values, features and feature values used by
+        the templates that are not mapped yet. Every kind is sent with one batch call
+        of the adapter and mapped in bulk.
+        """
+        self.ensure_one()
+        adapter = self._build_adapter()
+
+        variants = templates.product_variant_ids.filtered(
+            lambda x: self in x.integration_ids
+        )
+        attribute_values = variants.mapped(
+            'product_template_attribute_value_ids.product_attribute_value_id'
+        )
+        feature_lines = templates.mapped('feature_line_ids')
+
+        self._export_unmapped(adapter, attribute_values.mapped('attribute_id'), 'attributes')
+        self._export_unmapped(adapter, attribute_values, 'attribute_values')
+        self._export_unmapped(adapter, feature_lines.mapped('feature_id'), 'features')
+        self._export_unmapped(adapter, feature_lines.mapped('feature_value_id'), 'feature_values')
+
+    def _export_unmapped(self, adapter, records, kind):
+        MappingModel = self.env[f'integration.{records._name}.mapping']
+        internal_field_name, __ = MappingModel._mapping_fields
+
+        mapped_records = MappingModel.search([
+            ('integration_id', '=', self.id),
+            (internal_field_name, 'in', records.ids),
+        ]).mapped(internal_field_name)
+
+        records = records - mapped_records
+        if not records:
+            return
+
+        to_export = [x.to_export_format(self) for x in records]
+
+        parent_codes = []
+        if kind in EXPORT_PARENT_FIELDS:
+            parent_key, parent_model, parent_field = EXPORT_PARENT_FIELDS[kind]
+            if kind == 'attribute_values':
+                error_message = _('External attribute code cannot be empty. Attribute Value: %s')
+            else:
+                error_message = _('External feature code cannot be empty. Feature Value: %s')
+
+            # Same check as in the single record export, before anything is sent
+            for record, record_export in zip(records, to_export):
+                if not record_export.get(parent_key):
+                    raise UserError(error_message % record.name)
+                parent_codes.append(str(record_export[parent_key]))
+
+        codes = getattr(adapter, f'export_{kind}')(to_export)
+
+        extra_vals_list = [{'name': x.name} for x in records]
+
+        if parent_codes:
+            parents = self.env[parent_model].search([
+                ('integration_id', '=', self.id),
+                ('code', 'in', parent_codes),
+            ])
+            parents_by_code = {x.code: x.id for x in parents}
+
+            for extra_vals, parent_code in zip(extra_vals_list, parent_codes):
+                extra_vals[parent_field] = parents_by_code.get(parent_code, False)
+
+        MappingModel.create_integration_mappings(self, records, codes, extra_vals_list)
+
     def export_feature(self, feature):
         self.ensure_one()
         adapter = self._build_adapter()
@@ -1311,8 +1918,6 @@ class SaleIntegration(models.Model):
 
     def _build_adapter(self):
         self.ensure_one()
-        # Before building adapter make sure all default settings are there
-        self.write_settings_fields({})
         settings = self.to_dictionary()
         adapter = settings['class'](settings)
         adapter._env = self.env
@@ -1322,46 +1927,157 @@ class SaleIntegration(models.Model):
 
     def to_dictionary(self):
         self.ensure_one()
+        snapshot = self._get_settings_snapshot()
+
+        ApiField = self.env['sale.integration.api.field']
+
+        settings_fields = {}
+        field_records = None
+        for name, field in snapshot['fields'].items():
+            field = dict(field)
+            # Eval fields may depend on the integration state, so they are never cached.
+            # Fields missing in database are evaluated on a new record with the same globals
+            if field['eval'] and field['value']:
+                if field_records is None:
+                    field_records = {x.name: x for x in self.field_ids}
+                field_record = field_records.get(name) \
+                    or ApiField.new({'name': name, 'sia_id': self.id})
+                field['value'] = field_record.eval_value(field['value'])
+            settings_fields[name] = field
+
         return {
-            'name': self.name,
-            'type_api': self.type_api,
+            'name': snapshot['name'],
+            'type_api': snapshot['type_api'],
             'class': self.get_class(),
-            'fields': self.field_ids.to_dictionary(),
-            'data_block_size': int(self.env['ir.config_parameter'].sudo().get_param(
-                'integration.data_block_size'))
+            'fields': settings_fields,
+            'data_block_size': snapshot['data_block_size'],
+            'settings_version': snapshot['version'],
         }
 
+    @ormcache('self.id', 'self.settings_cache_version')
+    def _get_settings_snapshot(self):
+        """
+        Immutable snapshot of the integration settings. It is rebuilt only after the settings
+        are changed, so building adapter neither writes nor reads settings in every job.
+        Fields missing in database get default values here, they are saved on module upgrade
+        """
+        integration = self.sudo()
+
+        default_fields = integration.convert_settings_fields(
+            integration.get_default_settings_fields() or (),
+        )
+        settings_fields = {name: frozendict(field) for name, field in default_fields.items()}
+
+        for field in integration.field_ids:
+            settings_fields[field.name] = frozendict({
+                'name': field.name,
+                'description': field.description,
+                'value': field.value,
+                'eval': field.eval,
+                'is_secure': field.is_secure,
+            })
+
+        version = max(integration.field_ids.mapped('write_date'), default=False)
+
+        return frozendict({
+            'version': version and fields.Datetime.to_string(version),
+            'name': integration.name,
+            'type_api': integration.type_api,
+            'fields': frozendict(settings_fields),
+            'data_block_size': int(self.env['ir.config_parameter'].sudo().get_param(
+                'integration.data_block_size')),
+        })
+
     def integrationApiReceiveOrders(self):
         self.ensure_one()
 
+        # When new orders come with webhook, polling is only a safety net for lost webhooks
+        if self._is_order_webhook_active() and self.last_receive_orders_datetime:
+            next_polling = self.last_receive_orders_datetime + RECEIVE_ORDERS_SAFETY_NET_INTERVAL
+            if next_polling > fields.Datetime.now():
+                return self.env['sale.integration.input.file']
+
         adapter = self._build_adapter()
         input_files = adapter.receive_orders()
 
-        created_input_files = self.env['sale.integration.input.file']
+        created_input_files = self._create_input_files(input_files)
+
+        self._update_receive_orders_watermark(adapter, input_files)
+        self.update_last_receive_orders_datetime_to_now()
+
+        return created_input_files
+
+    def integrationApiReceiveOrder(self, order_id):
+        self.ensure_one()
+
+        adapter = self._build_adapter()
+        input_file = adapter.receive_order(order_id)
+
+        if not input_file:
+            return self.env['sale.integration.input.file']
+
+        return self._create_input_files([input_file])
+
+    def trigger_receive_order(self, order_id):
+        self.ensure_one()
+
+        integration = self.with_context(company_id=self.company_id.id)
+        return integration.with_delay(
+            identity_key=f'receive_order_{self.id}_{order_id}',
+            description='Receive Order',
+        ).integrationApiReceiveOrder(order_id)
+
+    def _get_order_created_webhook_topic(self):
+        return False
+
+    def _is_order_webhook_active(self):
+        self.ensure_one()
+        topic = self._get_order_created_webhook_topic()
+        if not topic:
+            return False
+
+        return any(
+            x.technical_name == topic and x.is_active for x in self.webhook_line_ids
+        )
+
+    def _create_input_files(self, input_files):
+        InputFile = self.env['sale.integration.input.file']
+
         for input_file in input_files:
             self._validate_input_file_format(input_file)
 
-            external_id = input_file['id']
-            exists = self.env['sale.integration.input.file'].search([
-                ('name', '=', external_id),
-                ('si_id', '=', self.id),
-            ], limit=1)
+        # Check existing input files for the whole batch at once
+        existing_names = self.get_received_order_ids([x['id'] for x in input_files])
 
-            if exists:
+        vals_list = []
+        for input_file in input_files:
+            external_id = str(input_file['id'])
+            if external_id in existing_names:
                 continue
 
-            input_file_data = input_file['data']
-            input_file_json = json.dumps(input_file_data, indent=4)
-
-            created_input_files += self.env['sale.integration.input.file'].create({
+            existing_names.add(external_id)
+            vals_list.append({
                 'name': external_id,
                 'si_id': self.id,
-                'raw_data': input_file_json,
+                'raw_data': InputFile.dump_raw_data(input_file['data']),
             })
 
-        self.update_last_receive_orders_datetime_to_now()
+        return InputFile.create(vals_list)
 
-        return created_input_files
+    def get_received_order_ids(self, order_ids):
+        """
+        Return external ids of the orders that already have input files
+        """
+        self.ensure_one()
+        input_files = self.env['sale.integration.input.file'].search([
+            ('si_id', '=', self.id),
+            ('name', 'in', [str(x) for x in order_ids]),
+        ])
+        return set(input_files.mapped('name'))
+
+    def _update_receive_orders_watermark(self, adapter, input_files):
+        """Hook to remember the latest order listed by the e-Commerce system"""
+        return
 
     def update_last_receive_orders_datetime_to_now(self):
         self.last_receive_orders_datetime = datetime.now()
@@ -1378,6 +2094,16 @@ class SaleIntegration(models.Model):
 
         return jobs
 
+    def trigger_create_orders_batch(self, input_files):
+        self.ensure_one()
+        integration = self.with_context(company_id=self.company_id.id)
+
+        while input_files:
+            integration.with_delay(description='Import Orders Batch')\
+                .create_orders_from_input(input_files[:CREATE_ORDER_BATCH])
+
+            input_files = input_files[CREATE_ORDER_BATCH:]
+
     def trigger_link_all(self):
         """Link integration to the all products."""
         self._apply_to_all(4)
@@ -1411,10 +2137,11 @@ class SaleIntegration(models.Model):
         product_variants = self.env['product.product'].search([])
         product_variants.write(vals)
 
-    def parse_order(self, input_file):
+    def parse_order(self, input_file, adapter=None):
         self.ensure_one()
 
-        adapter = self._build_adapter()
+        if adapter is None:
+            adapter = self._build_adapter()
 
         input_file_data = input_file.to_dict()
         order_data = adapter.parse_order(
@@ -1425,23 +2152,128 @@ class SaleIntegration(models.Model):
 
         return order_data
 
+    def create_orders_from_input(self, input_files):
+        """
+        Create orders of several input files in one job. The adapter and the lookups of
+        external codes are shared by all the orders. Every order is created in its own
+        savepoint, failed ones are re-queued as single order jobs to show the error.
+        """
+        self.ensure_one()
+
+        adapter = self._build_adapter()
+        lookup_cache = LookupCache()
+        sof = self.env['integration.sale.order.factory'].with_company(self.company_id)\
+            .with_context(
+                integration_lookup_cache=lookup_cache,
+                integration_products_prefetched=True,
+            )
+
+        orders = self.env['sale.order']
+        failed_input_files = self.env['sale.integration.input.file']
+
+        parsed_orders = []
+        for input_file in input_files.filtered(lambda x: x.state == 'draft' and not x.order_id):
+            try:
+                parsed_orders.append((input_file, self.parse_order(input_file, adapter)))
+            except Exception as ex:
+                _logger.warning('Parsing of input file %s failed: %s', input_file.name, ex)
+                failed_input_files |= input_file
+
+        orders_data = [order_data for __, order_data in parsed_orders]
+        self._prefetch_order_products(orders_data)
+        sof.prefetch_partners(self, orders_data)
+
+        pipelines = self.env['integration.workflow.pipeline']
+        for input_file, order_data in parsed_orders:
+            try:
+                with self.env.cr.savepoint():
+                    order = self._create_order_from_input(
+                        input_file, order_data, sof, run_workflow=False,
+                    )
+            except Exception as ex:
+                # Records found in cache may have been created in the rolled back savepoint
+                lookup_cache.clear()
+                _logger.warning('Order creation from input file %s failed: %s', input_file.name, ex)
+                failed_input_files |= input_file
+                continue
+
+            orders |= order
+            pipelines |= self._create_order_pipeline(order, order_data, input_file)
+
+        for input_file in failed_input_files:
+            self.with_delay(description='Import Order').create_order_from_input(input_file)
+
+        if pipelines:
+            pipelines.with_delay(
+                channel=self.env.ref('integration.channel_sale_order').complete_name,
+                description=f'Run Integration Workflows Batch: [{self.id}] {len(pipelines)}',
+            ).run_pipelines_batch()
+
+        return orders
+
+    def _create_order_pipeline(self, order, order_data, input_file):
+        try:
+            with self.env.cr.savepoint():
+                return order._create_integration_pipeline(order_data, input_file.id)
+        except Exception as ex:
+            _logger.warning('Workflow pipeline creation for %s failed: %s', order, ex)
+
+        # Order itself is fine, so run its workflow in a separate job to show the error
+        self._run_order_workflow(order, order_data, input_file)
+        return self.env['integration.workflow.pipeline']
+
+    def _prefetch_order_products(self, orders_data):
+        """
+        Import in one call all the external templates whose variants from the order lines
+        are not mapped yet. So orders don't make remote catalog calls one by one
+        """
+        variant_codes = {line['product_id'] for data in orders_data for line in data['lines']}
+        if not variant_codes:
+            return
+
+        mappings = self.env['integration.product.product.mapping'].search([
+            ('integration_id', '=', self.id),
+            ('external_product_id.code', 'in', list(variant_codes)),
+            ('product_id', '!=', False),
+        ])
+        missing_codes = variant_codes - set(mappings.mapped('external_product_id.code'))
+
+        template_codes = sorted({code.split('-')[0] for code in missing_codes})
+        if not template_codes:
+            return
+
+        try:
+            with self.env.cr.savepoint():
+                self.import_external_product(template_codes)
+        except Exception as ex:
+            # Orders with not imported products will fail and be re-queued one by one
+            _logger.warning('Import of order products %s failed: %s', template_codes, ex)
+
     def create_order_from_input(self, input_file):
         self.ensure_one()
 
         order_data = self.parse_order(input_file)
 
         sof = self.env['integration.sale.order.factory'].with_company(self.company_id)
+        return self._create_order_from_input(input_file, order_data, sof)
+
+    def _create_order_from_input(self, input_file, order_data, sof, run_workflow=True):
         order = sof.create_order(self, order_data)
 
         input_file.state = 'done'
         input_file.order_id = order.id
 
+        if run_workflow:
+            self._run_order_workflow(order, order_data, input_file)
+
+        return order
+
+    def _run_order_workflow(self, order, order_data, input_file):
         job_kwargs = {
             'channel': self.env.ref('integration.channel_sale_order').complete_name,
             'description': f'Create Integration Workflow: [{self.id}][{order.display_name}]',
         }
         order.with_delay(**job_kwargs)._run_integration_workflow(order_data, input_file.id)
-        return order
 
     def integrationApiCreateOrders(self):  # Seems this one not used currently
         self.ensure_one()
@@ -1659,13 +2491,20 @@ class SaleIntegration(models.Model):
         def wrap_title(string):
             return f'<div><strong>{string}</strong><hr/></div>'
 
-        tmpl_hub = adapter.get_templates_and_products_for_validation_test()
+        # Reading of the whole external catalog is slow, so the successful result is reused
+        # for a while. The explicit validation test (show_message) always runs it again
+        if show_message or not self._is_external_products_validation_cached():
+            template_ids, variant_ids, duplicated_ref, duplicated_bar = \
+                adapter.get_templates_and_products_for_validation_test().get_validation_issues()
 
-        template_ids, variant_ids = tmpl_hub.get_empty_ref_ids()
-        duplicated_ref = tmpl_hub.get_dupl_refs()
-        duplicated_bar = tmpl_hub.get_dupl_barcodes()
+            is_external_valid = not any((template_ids, variant_ids, duplicated_ref, duplicated_bar))
+            self.last_product_validation_datetime = \
+                is_external_valid and fields.Datetime.now() or False
+        else:
+            template_ids, variant_ids, duplicated_ref, duplicated_bar = [], [], {}, {}
+            is_external_valid = True
 
-        if any((template_ids, variant_ids, duplicated_ref, duplicated_bar)):
+        if not is_external_valid:
             warnings.append(
                 wrap_title(_('E-COMMERCE SYSTEM'))
             )
@@ -1695,18 +2534,8 @@ class SaleIntegration(models.Model):
             )
 
         # Test Odoo products
-        odoo_variant_ids = self.env['product.product'].search_read(
-            [],
-            fields=[
-                'id', 'barcode', 'default_code', 'product_tmpl_id',
-            ],
-        )
-
-        tmpl_hub_odoo = tmpl_hub.__class__.from_odoo(odoo_variant_ids)
-
-        __, variant_odoo_ids = tmpl_hub_odoo.get_empty_ref_ids()
-        duplicated_ref_odoo = tmpl_hub_odoo.get_dupl_refs()
-        duplicated_bar_odoo = tmpl_hub_odoo.get_dupl_barcodes()
+        variant_odoo_ids, duplicated_ref_odoo, duplicated_bar_odoo = \
+            self._get_odoo_products_validation_issues()
 
         if any((variant_odoo_ids, duplicated_ref_odoo, duplicated_bar_odoo)):
             warnings.append(
@@ -1743,16 +2572,122 @@ class SaleIntegration(models.Model):
 
         return False
 
+    def _is_external_products_validation_cached(self):
+        last_validation = self.last_product_validation_datetime
+        return bool(
+            last_validation
+            and fields.Datetime.now() - last_validation < PRODUCT_VALIDATION_CACHE_TTL
+        )
+
+    def _get_odoo_products_validation_issues(self):
+        """
+        Find Odoo variants without reference and duplicated references / barcodes
+        with grouping on the database side. Active flag and record rules are applied.
+        Ids are formatted as '<template id> - <variant id>'.
+        """
+        ProductProduct = self.env['product.product']
+        ProductProduct.flush(['default_code', 'barcode', 'product_tmpl_id', 'active'])
+
+        query = ProductProduct._where_calc([])
+        ProductProduct._apply_ir_rules(query, 'read')
+        from_clause, where_clause, params = query.get_sql()
+        where_clause = where_clause or 'TRUE'
+
+        table = ProductProduct._table
+        record_id = f"""concat("{table}".product_tmpl_id, ' - ', "{table}".id)"""
+
+        self.env.cr.execute(f"""
+            SELECT array_agg({record_id} ORDER BY "{table}".id)
+            FROM {from_clause}
+            WHERE {where_clause} AND COALESCE("{table}".default_code, '') = ''
+        """, params)
+        empty_ref_ids = self.env.cr.fetchone()[0] or []
+
+        duplicates = []
+        for field_name in ('default_code', 'barcode'):
+            self.env.cr.execute(f"""
+                SELECT "{table}".{field_name}, array_agg({record_id} ORDER BY "{table}".id)
+                FROM {from_clause}
+                WHERE {where_clause} AND COALESCE("{table}".{field_name}, '') != ''
+                GROUP BY "{table}".{field_name}
+                HAVING count(*) > 1
+            """, params)
+            duplicates.append(dict(self.env.cr.fetchall()))
+
+        duplicated_refs, duplicated_barcodes = duplicates
+        return empty_ref_ids, duplicated_refs, duplicated_barcodes
+
     def import_product(self, external_template, import_images=False):
         self.ensure_one()
 
         adapter = self._build_adapter()
 
-        ext_template, ext_products, ext_bom_components, images = adapter.get_product_for_import(
+        product_data = adapter.get_product_for_import(
             external_template.code,
             import_images=import_images,
         )
 
+        return self._import_product_data(external_template, product_data)
+
+    def import_products_batch(self, external_templates, import_images=False):
+        """
+        Import several templates with one request to the e-Commerce system.
+        Every template is imported in its own savepoint, so failed templates don't
+        affect the other ones. Failed templates are re-queued as single product import
+        jobs to show the error to the user.
+        """
+        self.ensure_one()
+
+        adapter = self._build_adapter()
+        products_data = adapter.get_products_for_import(
+            external_templates.mapped('code'),
+            import_images=import_images,
+        )
+
+        templates = self.env['product.template']
+        failed_templates = self.env['integration.product.template.external']
+
+        references, barcodes = [], []
+        for ext_template, ext_products, *__ in products_data.values():
+            for ext_record in [ext_template, *ext_products]:
+                references.append(ext_record.get('default_code'))
+                barcodes.append(ext_record.get('barcode'))
+
+        product_index = external_templates.build_product_index(references, barcodes)
+        external_templates = external_templates.with_context(
+            integration_product_index=product_index,
+        )
+
+        for external_template in external_templates:
+            product_data = products_data.get(external_template.code)
+            if not product_data:
+                failed_templates |= external_template
+                continue
+
+            try:
+                with self.env.cr.savepoint():
+                    template = self._import_product_data(external_template, product_data)
+            except Exception as ex:
+                # Values of the rolled back records may remain in cache
+                self.env.clear()
+                _logger.warning(
+                    'Import of the product %s failed: %s', external_template.code, ex,
+                )
+                failed_templates |= external_template
+            else:
+                # Next templates of the block must see the variants created just now
+                product_index.add_products(template.product_variant_ids)
+                templates |= template
+
+        for external_template in failed_templates:
+            self.with_delay(description='Import Single Product (retry after batch)')\
+                .import_product(external_template, import_images=import_images)
+
+        return templates
+
+    def _import_product_data(self, external_template, product_data):
+        ext_template, ext_products, ext_bom_components, images = product_data
+
         try:
             return external_template.import_one_product(
                 ext_template,
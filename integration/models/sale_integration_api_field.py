@@ -30,6 +30,25 @@ class SaleIntegrationAPIFields(models.Model):
         string='Is Secure',
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        # Settings are part of the cached settings snapshot and webhook verification context
+        records.mapped('sia_id')._bump_settings_cache_version()
+        return records
+
+    def write(self, vals):
+        integrations = self.mapped('sia_id')
+        res = super().write(vals)
+        (integrations | self.mapped('sia_id'))._bump_settings_cache_version()
+        return res
+
+    def unlink(self):
+        integrations = self.mapped('sia_id')
+        res = super().unlink()
+        integrations._bump_settings_cache_version()
+        return res
+
     def get_eval_globals(self):
         self.ensure_one()
         eval_globals = {
@@ -37,6 +56,13 @@ class SaleIntegrationAPIFields(models.Model):
         }
         return eval_globals
 
+    def eval_value(self, value):
+        """
+        Evaluate value of the eval setting with the globals of `get_eval_globals()`
+        """
+        self.ensure_one()
+        return safe_eval(value, self.get_eval_globals())
+
     @api.model
     def to_dictionary(self):
         sia_fields = {}
@@ -44,8 +70,7 @@ class SaleIntegrationAPIFields(models.Model):
             value = field.value
 
             if field.eval and value:
-                eval_globals = field.get_eval_globals()
-                value = safe_eval(field.value, eval_globals)
+                value = field.eval_value(value)
 
             sia_fields[field.name] = {
                 'name': field.name,
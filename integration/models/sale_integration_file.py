@@ -76,6 +76,14 @@ class SaleIntegrationFile(models.Model):
         )
     ]
 
+    @api.model
+    def dump_raw_data(self, data):
+        """
+        Raw data is stored as compact JSON: it's pretty-printed only for displaying.
+        Large values are compressed by PostgreSQL (TOAST) on top of that
+        """
+        return json.dumps(data, separators=(',', ':'))
+
     def action_cancel(self):
         orders = self.filtered(lambda s: s.state in ['draft', 'unknown'])
         return orders.write(
@@ -110,13 +118,14 @@ class SaleIntegrationInputFile(models.Model):
         help='Reference received from the input file',
     )
 
-    @api.model
+    @api.model_create_multi
     def create(self, vals_list):
         input_files = super(SaleIntegrationInputFile, self).create(vals_list)
 
-        for input_file in input_files:
-            input_file = input_file.with_context(company_id=input_file.si_id.company_id.id)
-            input_file.with_delay(description='Run Process "Create Orders"').process()
+        for integration in input_files.mapped('si_id'):
+            integration.trigger_create_orders_batch(
+                input_files.filtered(lambda x: x.si_id == integration),
+            )
 
         return input_files
 
@@ -138,7 +147,7 @@ class SaleIntegrationInputFile(models.Model):
         for input_file in self:
             try:
                 input_file.display_data = json.dumps(
-                    self.with_context(bin_size=False).to_dict(),
+                    input_file.with_context(bin_size=False).to_dict(),
                     indent=4,
                 )
             except json.decoder.JSONDecodeError:
@@ -147,12 +156,11 @@ class SaleIntegrationInputFile(models.Model):
     def _inverse_display_data(self):
         for input_file in self:
             try:
-                json.loads(input_file.display_data)
-                input_file.raw_data = input_file.display_data
+                data = json.loads(input_file.display_data)
             except json.decoder.JSONDecodeError as e:
                 raise UserError(_('Incorrect file format:\n\n') + e.msg)
 
-            input_file.raw_data = input_file.display_data
+            input_file.raw_data = input_file.dump_raw_data(data)
 
     def process(self):
         self.ensure_one()
@@ -226,6 +226,15 @@ class SaleOrder(models.Model):
         return integration.with_delay(identity_key=key).export_tracking(done_pickings)
 
     def _run_integration_workflow(self, order_data, input_file_id=False):
+        self.ensure_one()
+        pipeline = self._create_integration_pipeline(order_data, input_file_id)
+
+        job_kwargs = self._build_workflow_job_kwargs()
+        pipeline.with_delay(**job_kwargs).trigger_pipeline()
+
+        return pipeline
+
+    def _create_integration_pipeline(self, order_data, input_file_id=False):
         self.ensure_one()
         pipeline = self.integration_pipeline
 
@@ -250,9 +259,6 @@ class SaleOrder(models.Model):
             pipeline = self.env['integration.workflow.pipeline'].create(pipeline_vals)
             _logger.info('New pipeline for %s was created: %s', self, pipeline)
 
-        job_kwargs = self._build_workflow_job_kwargs()
-        pipeline.with_delay(**job_kwargs).trigger_pipeline()
-
         return pipeline
 
     def _build_workflow_job_kwargs(self):
@@ -363,6 +369,16 @@ class SaleOrder(models.Model):
         result = self.action_confirm()
         return result, _('%s [%s] confirmed successfully.') % (self, self.display_name)
 
+    def _integration_validate_order_batch(self):
+        _logger.info('Run integration auto-workflow validate_order for %s orders', len(self))
+        orders = self.filtered(lambda x: x.state not in ('sale', 'done', 'cancel'))
+
+        if not orders:
+            return True, _('The orders have been already confirmed.')
+
+        result = orders.action_confirm()
+        return result, _('%s orders confirmed successfully.') % len(orders)
+
     def _integration_validate_picking(self):
         _logger.info('Run integration auto-workflow validate_picking')
         self.ensure_one()
@@ -404,6 +420,16 @@ class SaleOrder(models.Model):
             return True, _('[%s] %s validated invoices successfully.') % (self, invoices)
         return result, ''
 
+    def _integration_validate_invoice_batch(self):
+        _logger.info('Run integration auto-workflow validate_invoice for %s orders', len(self))
+        invoices = self.mapped('invoice_ids').filtered(lambda x: x.state == 'draft')
+
+        for company in invoices.mapped('company_id'):
+            invoices.filtered(lambda x: x.company_id == company)\
+                .with_company(company).action_post()
+
+        return True, _('%s invoices validated successfully.') % len(invoices)
+
     def _integration_register_payment(self):
         _logger.info('Run integration auto-workflow register_payment')
         self.ensure_one()
@@ -31,9 +31,10 @@ class TemplateConverter:
 
         search_domain = Template._template_ecommerce_field_domain(self._integration, external_id)
 
-        for field in self.env['product.ecommerce.field.mapping'].\
-                search(search_domain).mapped('ecommerce_field_id'):
-            result[field.technical_name] = self._integration.calculate_field_value(template, field)
+        ecommerce_fields = self.env['product.ecommerce.field.mapping'].\
+            search(search_domain).mapped('ecommerce_field_id')
+        fields_values = self._integration.calculate_fields_values(template, ecommerce_fields)
+        result.update(fields_values[template.id])
 
         result_upd = Template._template_converter_update(
             result,
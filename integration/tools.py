@@ -1,8 +1,6 @@
 # See LICENSE file for full copyright and licensing details.
 
 import base64
-from itertools import groupby
-from operator import attrgetter
 from collections import namedtuple, defaultdict, OrderedDict
 
 from cerberus import Validator
@@ -34,8 +32,73 @@ def not_implemented(method):
     return wrapper
 
 
+class LookupCache(dict):
+    """
+    Cache of Odoo records found by external codes, shared by the orders of one batch.
+    Hashed by identity, so it can be passed in context.
+    """
+
+    __hash__ = object.__hash__
+
+    def __eq__(self, other):
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
+
+
+class ProductIndex:
+    """
+    Odoo variants indexed by lower() reference and by barcode, built once for a block
+    of imported products. Keeps all the variants of the found templates, so template
+    level checks don't need extra queries.
+    """
+
+    def __init__(self):
+        self.by_reference = defaultdict(set)
+        self.by_barcode = defaultdict(set)
+        self.product_template = dict()
+        self.template_variants = defaultdict(dict)
+
+    def add(self, product_id, template_id, default_code, barcode):
+        if default_code:
+            self.by_reference[default_code.lower()].add(product_id)
+        if barcode:
+            self.by_barcode[barcode].add(product_id)
+
+        self.product_template[product_id] = template_id
+        self.template_variants[template_id][product_id] = {
+            'default_code': default_code,
+            'barcode': barcode,
+        }
+
+    def add_products(self, products):
+        for product in products:
+            self.add(product.id, product.product_tmpl_id.id, product.default_code, product.barcode)
+
+    def find_products(self, field_name, value):
+        if field_name == 'default_code':
+            return sorted(self.by_reference.get((value or '').lower(), []))
+        return sorted(self.by_barcode.get(value, []))
+
+    def find_templates(self, field_name, value):
+        template_ids = {self.product_template[x] for x in self.find_products(field_name, value)}
+
+        if field_name == 'default_code':
+            # Template reference is set only when template has a single variant
+            template_ids = {x for x in template_ids if len(self.template_variants[x]) == 1}
+
+        return sorted(template_ids)
+
+    def get_template_values(self, template_id, field_name):
+        return [x[field_name] for x in self.template_variants[template_id].values()]
+
+
 class TemplateHub:
-    """Validate products before import."""
+    """
+    Validate products before import. Products are kept as tuples, references and barcodes
+    are indexed once on creation, so all the checks are answered from the indexes.
+    """
 
     _schema = OrderedDict({
         'id': {'type': 'string', 'required': True},
@@ -45,67 +108,91 @@ class TemplateHub:
         'skip_ref': {'type': 'boolean', 'required': True},
     })
 
+    ptuple = namedtuple('Product', _schema.keys())
+
     def __init__(self, input_list):
+        """
+        :param input_list: list of dicts or tuples in the order of the `_schema` keys
+        """
         assert type(input_list) == list
         # Because it works very slow with big pack of data
         # self._validate_input(input_list)
 
-        self.ptuple = namedtuple('Product', self._schema.keys())
         self.product_list = self._convert_to_clean(input_list)
+        self._build_indexes()
 
     def __iter__(self):
         for rec in self.product_list:
             yield rec
 
+    def _build_indexes(self):
+        self._empty_ref_templates = []
+        self._empty_ref_variants = []
+        self._by_ref = defaultdict(list)
+        self._by_barcode = defaultdict(list)
+
+        for rec in self.product_list:
+            formatted_id = self._format_rec(rec)
+
+            if not rec.skip_ref:
+                if rec.ref:
+                    self._by_ref[rec.ref].append(formatted_id)
+                elif rec.parent_id:
+                    self._empty_ref_variants.append(formatted_id)
+                else:
+                    self._empty_ref_templates.append(formatted_id)
+
+            if rec.barcode:
+                self._by_barcode[rec.barcode].append(formatted_id)
+
     def get_empty_ref_ids(self):
         """
         :result: ([1, 2, 3], [4, 5, 6])
         """
-        templates, variants = self._split_products(
-            [x for x in self if not x.ref and not x.skip_ref]
-        )
-        return [self._format_rec(t) for t in templates], [self._format_rec(v) for v in variants]
+        return list(self._empty_ref_templates), list(self._empty_ref_variants)
 
     def get_dupl_refs(self):
         """
         :result: {'BAR': [1, 2], 'FOO': [1, 2, 3]}
         """
-        products = [x for x in self if x.ref and not x.skip_ref]
-        return self._group_by(products, 'ref', level=2)
+        return self._get_duplicates(self._by_ref)
 
     def get_dupl_barcodes(self):
         """
         :result: {'XX01': [1, 2], 'XX02': [1, 2, 3]}
         """
-        products = [x for x in self if x.barcode]
-        return self._group_by(products, 'barcode', level=2)
+        return self._get_duplicates(self._by_barcode)
+
+    def get_validation_issues(self):
+        """
+        Result of get_empty_ref_ids(), get_dupl_refs() and get_dupl_barcodes() together.
+
+        :result: ([1, 2], [3, 4], {'BAR': [1, 2]}, {'XX01': [1, 2]})
+        """
+        return (*self.get_empty_ref_ids(), self.get_dupl_refs(), self.get_dupl_barcodes())
 
     @classmethod
     def from_odoo(cls, search_list):
         """Make class instance from odoo search."""
-        def parse_args(rec):
-            return {
-                'id': str(rec['id']),
-                'barcode': rec['barcode'] or str(),
-                'ref': rec['default_code'] or str(),
-                'parent_id': str(rec['product_tmpl_id'][0]),
-                'skip_ref': False,
-            }
-        return cls([parse_args(rec) for rec in search_list])
+        return cls([
+            (
+                str(rec['id']),
+                rec['barcode'] or str(),
+                rec['default_code'] or str(),
+                str(rec['product_tmpl_id'][0]),
+                False,
+            )
+            for rec in search_list
+        ])
 
     @classmethod
     def get_ref_intersection(cls, self_a, self_b):
         """Find references intersection of different instances."""
-        def parse_ref(self_):
-            return {x.ref for x in self_ if x.ref and not x.skip_ref}
-
-        def filter_records(scope):
-            return [x for x in self_a if x.ref in scope], [x for x in self_b if x.ref in scope]
-
-        joint_ref = parse_ref(self_a) & parse_ref(self_b)
-        records_a, records_b = filter_records(joint_ref)
-
-        return self_a._group_by(records_a, 'ref'), self_b._group_by(records_b, 'ref')
+        joint_ref = self_a._by_ref.keys() & self_b._by_ref.keys()
+        return (
+            {ref: list(self_a._by_ref[ref]) for ref in joint_ref},
+            {ref: list(self_b._by_ref[ref]) for ref in joint_ref},
+        )
 
     def _validate_input(self, input_list):
         frame = Validator(self._schema)
@@ -120,6 +207,9 @@ class TemplateHub:
         return [self._serialize_by_scheme(rec) for rec in input_list]
 
     def _serialize_by_scheme(self, record):
+        if isinstance(record, tuple):
+            return self.ptuple._make(record)
+
         args_list = [record[key] for key in self._schema.keys()]
         return self.ptuple(*args_list)
 
@@ -128,19 +218,5 @@ class TemplateHub:
         return f'{rec.parent_id} - {rec.id}' if rec.parent_id else rec.id
 
     @staticmethod
-    def _split_products(records):
-        templates = [x for x in records if not x.parent_id]
-        variants = [x for x in records if x.parent_id]
-        return templates, variants
-
-    def _group_by(self, records, attr, level=False):
-        dict_ = defaultdict(list)
-        [
-            [dict_[key].append(self._format_rec(x)) for x in grouper]
-            for key, grouper in groupby(records, key=attrgetter(attr))
-        ]
-        if level:
-            return {
-                key: val for key, val in dict_.items() if len(val) >= level
-            }
-        return dict(dict_)
+    def _get_duplicates(index):
+        return {key: list(val) for key, val in index.items() if len(val) > 1}
@@ -22,6 +22,8 @@
     'data': [
         'security/ir.model.access.csv',
         'data/product_ecommerce_fields.xml',
+        'data/sale_integration_data.xml',
+        'data/ir_cron_data.xml',
         'views/sale_integration.xml',
         'views/external/integration_product_public_category_external_views.xml',
         'wizard/configuration_wizard_prestashop.xml',
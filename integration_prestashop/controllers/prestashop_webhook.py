@@ -56,61 +56,29 @@ class PrestashopWebhook(Controller, IntegrationWebhook):
         if not is_valid_webhook:
             return
 
-        is_done_action = self._run_method_from_header()
-        return is_done_action
+        return self.store_webhook_event()
 
-    def actionValidateOrder(self):
+    @route(f'/<string:dbname>/integration/{PRESTASHOP}/<int:integration_id>/products', **_kwargs)
+    def prestashop_products(self, *args, **kw):
         """
-        Order Created
-        Method is not implemented
-        """
-        _logger.info('Call prestashop webhook controller: actionValidateOrder()')
-        pass
-
-    def actionOrderHistoryAddAfter(self):
-        """
-        Order Status Updated
+        Expected methods:
+            actionProductAdd (Product Created)
+            actionProductUpdate (Product Updated)
+            actionProductDelete (Product Deleted)
         """
-        _logger.info('Call prestashop webhook controller actionOrderHistoryAddAfter()')
-
-        post_data = self._get_post_data()
-
-        order_code = post_data['order']['id']
-        reference = post_data['order']['reference']
-        order = self.env['sale.order'].from_external(self.integration, order_code, False)
-        if not order:
-            _logger.error(
-                'Prestashop Order not found, code=%s (reference=%s)', order_code, reference
-            )
-            return False
-
-        status_code = post_data['order']['current_state']
-        sub_status_id = self.env['sale.order.sub.status']\
-            .from_external(self.integration, status_code, False)
-        if not sub_status_id:
-            _logger.error('Sub status not found for code: %s' % status_code)
-            return False
+        _logger.info('Call prestashop webhook controller: products()')
 
-        order.sub_status_id = sub_status_id
-
-        if self.integration.run_action_on_cancel_so \
-                and sub_status_id == self.integration.sub_status_cancel_id:
-            job_kwargs = order._build_workflow_job_kwargs()
-            job_kwargs['description'] = 'Integration Cancel Order'
+        self.set_integration(*args, **kw)
 
-            order.with_delay(**job_kwargs)._integration_action_cancel()
-            return True
+        is_valid_webhook = self.verify_webhook(*args, **kw)
+        if not is_valid_webhook:
+            return
 
-        return False
+        return self.store_webhook_event()
 
-    def _check_webhook_digital_sign(self, adapter):
+    def _check_webhook_digital_sign(self, verification_context):
         return True  # TODO
 
-    def _get_hook_name_method(self):
-        headers = self._get_headers()
-        header_name = self._get_hook_name_header()
-        return headers[header_name]
-
     @staticmethod
     def _get_hook_name_header():
         return 'X-Hook'
@@ -133,6 +101,5 @@ class PrestashopWebhook(Controller, IntegrationWebhook):
         :return: web_base_url
         Hedar with the shop's domain name is expected
         """
-        adapter = self.integration._build_adapter()
-        settings_url = adapter.get_settings_value('url')
-        return settings_url
+        context = self.integration._get_webhook_verification_context()
+        return context['url']
@@ -6,6 +6,7 @@ from . import product_template
 from . import product_product
 from . import product_public_category
 from . import res_partner
+from . import integration_prestashop_product_mirror
 
 from . import sale_integration
 from . import fields
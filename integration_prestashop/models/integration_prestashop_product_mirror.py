@@ -0,0 +1,90 @@
+#  See LICENSE file for full copyright and licensing details.
+
+from odoo import models, fields, api
+
+
+class IntegrationPrestashopProductMirror(models.Model):
+    _name = 'integration.prestashop.product.mirror'
+    _description = 'Integration PrestaShop Product Mirror'
+
+    integration_id = fields.Many2one(
+        comodel_name='sale.integration',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    product_code = fields.Char(
+        string='Product ID',
+        required=True,
+        index=True,
+    )
+    combination_code = fields.Char(
+        string='Combination ID',
+        required=True,
+        default='0',
+        help='"0" for the row of the product itself',
+    )
+    reference = fields.Char(
+        string='Reference',
+        index=True,
+    )
+    barcode = fields.Char(
+        string='Barcode',
+        index=True,
+    )
+    option_value_codes = fields.Char(
+        string='Option Value IDs',
+        help='Comma separated ids of the combination option values',
+    )
+
+    _sql_constraints = [
+        (
+            'uniq_product_combination',
+            'unique(integration_id, product_code, combination_code)',
+            'Product combination should be unique',
+        ),
+    ]
+
+    @api.model
+    def refresh(self, integration, product_codes=None, adapter=None):
+        """
+        Replace rows of the products with the actual data from PrestaShop.
+        Without product codes the whole mirror of the integration is rebuilt.
+        """
+        if product_codes is not None and not product_codes:
+            return self
+
+        adapter = adapter or integration._build_adapter()
+        rows = adapter.get_products_mirror_data(product_codes)
+
+        self.remove(integration, product_codes)
+        return self.create([dict(row, integration_id=integration.id) for row in rows])
+
+    @api.model
+    def remove(self, integration, product_codes=None):
+        domain = [('integration_id', '=', integration.id)]
+        if product_codes is not None:
+            domain.append(('product_code', 'in', product_codes))
+
+        self.search(domain).unlink()
+
+    @api.model
+    def remove_deleted(self, integration, existing_product_codes):
+        self.env.cr.execute(
+            'SELECT DISTINCT product_code FROM integration_prestashop_product_mirror '
+            'WHERE integration_id = %s',
+            (integration.id,),
+        )
+        mirrored_codes = {x[0] for x in self.env.cr.fetchall()}
+        self.remove(integration, list(mirrored_codes - set(existing_product_codes)))
+
+    @api.model
+    def find_by_references(self, integration, references):
+        return self.search([
+            ('integration_id', '=', integration.id),
+            ('reference', 'in', references),
+        ])
+
+    def get_option_value_codes(self):
+        self.ensure_one()
+        return self.option_value_codes.split(',') if self.option_value_codes else []
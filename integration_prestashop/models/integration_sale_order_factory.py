@@ -14,8 +14,9 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
 
         if is_prestashop and order_data['carrier']:
             carrier_code = order_data['carrier']
-            carrier = self.env['delivery.carrier'].from_external(
+            carrier = self._from_external(
                 integration,
+                'delivery.carrier',
                 carrier_code,
                 raise_error=False,
             )
@@ -64,6 +65,6 @@ class IntegrationSaleOrderFactory(models.AbstractModel):
                     vals[customer_registration_date_field.name] = customer_registration_date
 
         if vals:
-            partner.write(vals)
+            self._write_partner_changes(partner, vals)
 
         return partner
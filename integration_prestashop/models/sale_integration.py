@@ -2,11 +2,18 @@
 
 from ..prestashop_api import PrestaShopApiClient, PRESTASHOP
 from odoo import models, fields, api, _
+from odoo.addons.integration.models.sale_integration import PRODUCT_SYNC_OVERLAP
 from odoo.exceptions import ValidationError
 
+import logging
+from datetime import datetime, timedelta
+
 import pytz
 
 DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+PRODUCT_WEBHOOK_TOPICS = ('actionProductAdd', 'actionProductUpdate', 'actionProductDelete')
+
+_logger = logging.getLogger(__name__)
 
 
 class SaleIntegration(models.Model):
@@ -23,6 +30,19 @@ class SaleIntegration(models.Model):
         compute='_compute_presta_last_receive_orders_datetime',
     )
 
+    presta_receive_orders_watermark = fields.Datetime(
+        string='Latest Received Order Update',
+        copy=False,
+        help='The latest "date_upd" of the orders received from PrestaShop',
+    )
+
+    presta_product_mirror_datetime = fields.Datetime(
+        string='Product Mirror Refreshed',
+        copy=False,
+        help='When the local mirror of PrestaShop products was refreshed the last time. '
+             'Empty until the mirror is built for the first time',
+    )
+
     product_delivery_in_stock = fields.Many2one(
         string='In-stock Delivery Days field',
         comodel_name='ir.model.fields',
@@ -93,7 +113,7 @@ class SaleIntegration(models.Model):
             ('name', '=', field_name),
         ], limit=1)
 
-    @api.depends('last_receive_orders_datetime')
+    @api.depends('last_receive_orders_datetime', 'presta_receive_orders_watermark')
     def _compute_presta_last_receive_orders_datetime(self):
         for integration in self:
             value = ''
@@ -101,18 +121,51 @@ class SaleIntegration(models.Model):
             if integration.type_api == PRESTASHOP:
                 ps_timezone = integration.get_settings_value('PS_TIMEZONE')
                 if ps_timezone:
-                    timezone = pytz.timezone(ps_timezone)
-                    value = integration.last_receive_orders_datetime.astimezone(
-                        timezone,
+                    # Orders are searched from the latest received one, not from the time of
+                    # the previous request. So orders updated during slow request aren't lost
+                    date_from = integration.presta_receive_orders_watermark
+                    if date_from:
+                        overlap = integration.get_settings_value('receive_orders_overlap')
+                        date_from -= timedelta(minutes=int(overlap or 0))
+                    else:
+                        date_from = integration.last_receive_orders_datetime
+
+                    value = pytz.utc.localize(date_from).astimezone(
+                        pytz.timezone(ps_timezone),
                     )
                     value = value.strftime(DATETIME_FORMAT)
 
             integration.presta_last_receive_orders_datetime = value
 
+    def _update_receive_orders_watermark(self, adapter, input_files):
+        if not self.is_prestashop():
+            return super(SaleIntegration, self)._update_receive_orders_watermark(
+                adapter, input_files)
+
+        ps_timezone = self.get_settings_value('PS_TIMEZONE')
+        # Listing includes already received orders too, so the watermark doesn't stall
+        latest_update = adapter.orders_listing_date_upd
+        if not latest_update or not ps_timezone:
+            return
+
+        latest_update = pytz.timezone(ps_timezone).localize(
+            datetime.strptime(latest_update, DATETIME_FORMAT),
+        )
+        latest_update = latest_update.astimezone(pytz.utc).replace(tzinfo=None)
+
+        watermark = self.presta_receive_orders_watermark
+        if not watermark or latest_update > watermark:
+            self.presta_receive_orders_watermark = latest_update
+
     def is_prestashop(self):
         self.ensure_one()
         return self.type_api == PRESTASHOP
 
+    def _is_price_export_supported(self):
+        if self.is_prestashop():
+            return True
+        return super(SaleIntegration, self)._is_price_export_supported()
+
     def get_class(self):
         self.ensure_one()
         if self.is_prestashop():
@@ -132,6 +185,115 @@ class SaleIntegration(models.Model):
 
         return result
 
+    def _get_order_created_webhook_topic(self):
+        if self.is_prestashop():
+            return 'actionValidateOrder'
+        return super(SaleIntegration, self)._get_order_created_webhook_topic()
+
+    def _get_webhook_event_key(self, topic, payload):
+        if self.is_prestashop() and topic in ('actionValidateOrder', 'actionOrderHistoryAddAfter'):
+            return payload['order']['id']
+        if self.is_prestashop() and topic in PRODUCT_WEBHOOK_TOPICS:
+            return payload['product']['id']
+        return super(SaleIntegration, self)._get_webhook_event_key(topic, payload)
+
+    @api.model
+    def cron_refresh_presta_product_mirror(self):
+        integrations = self.get_integrations('export_template', None)\
+            .filtered(lambda x: x.is_prestashop())
+
+        for integration in integrations:
+            integration.with_context(company_id=integration.company_id.id).with_delay(
+                identity_key=f'refresh_presta_product_mirror_{integration.id}',
+                description='PrestaShop: Refresh Product Mirror',
+            ).refresh_presta_product_mirror()
+
+    def refresh_presta_product_mirror(self):
+        """
+        Build the mirror of PrestaShop products on the first run, then refresh only
+        the products changed since the previous run and drop the deleted ones
+        """
+        self.ensure_one()
+        ProductMirror = self.env['integration.prestashop.product.mirror']
+        adapter = self._build_adapter()
+        refresh_datetime = fields.Datetime.now()
+
+        if not self.presta_product_mirror_datetime:
+            ProductMirror.refresh(self, adapter=adapter)
+        else:
+            date_from = self.presta_product_mirror_datetime - PRODUCT_SYNC_OVERLAP
+            product_codes = [str(x) for x in adapter.get_updated_product_template_ids(date_from)]
+            ProductMirror.refresh(self, product_codes, adapter=adapter)
+
+            # The same product filter as for the mirror itself, so products that
+            # don't pass it anymore (e.g. deactivated) are dropped too
+            existing_codes = [str(x) for x in adapter.get_product_template_ids()]
+            # Empty answer is rather a problem on the PrestaShop side
+            if existing_codes:
+                ProductMirror.remove_deleted(self, existing_codes)
+
+        self.presta_product_mirror_datetime = refresh_datetime
+
+    def _webhook_actionProductAdd(self, payload):
+        """
+        Product Created
+        """
+        self._refresh_presta_product_mirror_row(payload['product']['id'])
+
+    def _webhook_actionProductUpdate(self, payload):
+        """
+        Product Updated
+        """
+        self._refresh_presta_product_mirror_row(payload['product']['id'])
+
+    def _webhook_actionProductDelete(self, payload):
+        """
+        Product Deleted
+        """
+        self.env['integration.prestashop.product.mirror']\
+            .remove(self, [str(payload['product']['id'])])
+
+    def _refresh_presta_product_mirror_row(self, product_code):
+        # Until the mirror is built there is nothing to keep up to date
+        if self.presta_product_mirror_datetime:
+            self.env['integration.prestashop.product.mirror'].refresh(self, [str(product_code)])
+
+    def _webhook_actionValidateOrder(self, payload):
+        """
+        Order Created
+        """
+        self.trigger_receive_order(payload['order']['id'])
+
+    def _webhook_actionOrderHistoryAddAfter(self, payload):
+        """
+        Order Status Updated
+        """
+        order_code = payload['order']['id']
+        reference = payload['order']['reference']
+        order = self.env['sale.order'].from_external(self, order_code, False)
+        if not order:
+            _logger.info(
+                'Prestashop Order not found, code=%s (reference=%s). Trying to receive it',
+                order_code,
+                reference,
+            )
+            # Order may have got the status required by the receive orders filter
+            self.trigger_receive_order(order_code)
+            return
+
+        status_code = payload['order']['current_state']
+        sub_status_id = self.env['sale.order.sub.status'].from_external(self, status_code, False)
+        if not sub_status_id:
+            raise ValidationError(_('Sub status not found for code: %s') % status_code)
+
+        order.sub_status_id = sub_status_id
+
+        if self.run_action_on_cancel_so and sub_status_id == self.sub_status_cancel_id:
+            job_kwargs = order._build_workflow_job_kwargs()
+            job_kwargs['description'] = 'Integration Cancel Order'
+
+            order.with_delay(**job_kwargs)._integration_action_cancel()
+
     def _retrieve_webhook_routes(self):
         if self.is_prestashop():
             routes = {
@@ -139,6 +301,11 @@ class SaleIntegration(models.Model):
                     ('Order Created', 'actionValidateOrder'),
                     ('Order Status Updated', 'actionOrderHistoryAddAfter'),
                 ],
+                'products': [
+                    ('Product Created', 'actionProductAdd'),
+                    ('Product Updated', 'actionProductUpdate'),
+                    ('Product Deleted', 'actionProductDelete'),
+                ],
             }
             return routes
         return super(SaleIntegration, self)._retrieve_webhook_routes()
@@ -1,5 +1,6 @@
 #  See LICENSE file for full copyright and licensing details.
 
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 import logging
 
@@ -8,12 +9,15 @@ _logger = logging.getLogger(__name__)
 
 
 PRESTASHOP = 'prestashop'
+SHOP_EDIT_WORKERS = 4
 
 
 class BaseModel:
     _name = None
     _required_fields = []
     _skip_if_absent_in_schema = []
+    _price_fields = []
+    _shop_edit_workers = SHOP_EDIT_WORKERS
 
     _data = {}
 
@@ -92,8 +96,8 @@ class BaseModel:
 
         return records
 
-    def save(self):
-        vals = self._prepare_save_vals()
+    def save(self, schema=None):
+        vals = self._prepare_save_vals(schema)
         result = self._save(vals)
         return result
 
@@ -118,6 +122,37 @@ class BaseModel:
         self._data = result
         return result
 
+    def edit_fields(self, vals, id_shop=None):
+        """
+        Send only `vals` (plus id) instead of the whole record. Webservice loads the stored
+        object before applying the payload, so the fields absent in it keep their values
+        """
+        options = {'id_shop': id_shop} if id_shop else self._id_group_shop_options
+        content = {self._name: dict(vals, id=str(self.id))}
+        return self._client.edit(self._plural_name, content, options=options)
+
+    def edit_fields_per_shop(self, vals, shop_ids=None):
+        shop_ids = self._shop_ids if shop_ids is None else shop_ids
+        if len(shop_ids) < 2 or self._shop_edit_workers < 2:
+            for shop_id in shop_ids:
+                self.edit_fields(vals, shop_id)
+            return
+
+        with ThreadPoolExecutor(max_workers=self._shop_edit_workers) as executor:
+            list(executor.map(lambda x: self.edit_fields(vals, x), shop_ids))
+
+    def _get_price_vals(self, vals):
+        object_data = vals[self._name]
+        result = {}
+        for field in self._price_fields:
+            if field not in object_data:
+                continue
+            value = object_data[field]
+            if isinstance(value, dict) and 'value' in value:
+                value = value['value']
+            result[field] = value
+        return result
+
     def search(self, filters=None):
         if filters is None:
             filters = {}
@@ -143,13 +178,21 @@ class BaseModel:
 
         return result
 
-    def search_read(self, filters, fields=None, limit=None, sort=None, skip_translation=False):
+    def search_read(
+        self,
+        filters,
+        fields=None,
+        limit=None,
+        sort=None,
+        skip_translation=False,
+        options=None,
+    ):
         if filters is None:
             filters = {}
 
-        options = {
+        options = dict(options or {}, **{
             'filter[{}]'.format(key): value for key, value in filters.items()
-        }
+        })
 
         if not fields:
             options['display'] = 'full'
@@ -185,7 +228,14 @@ class BaseModel:
 
         return data
 
-    def search_read_by_blocks(self, filters, fields=None, sort=None, skip_translation=False):
+    def search_read_by_blocks(
+        self,
+        filters,
+        fields=None,
+        sort=None,
+        skip_translation=False,
+        options=None,
+    ):
         response = []
         last = 0
         step = self._data_block_size
@@ -195,7 +245,8 @@ class BaseModel:
                 fields=fields,
                 sort=sort,
                 skip_translation=skip_translation,
-                limit='%d,%d' % (last, step)
+                limit='%d,%d' % (last, step),
+                options=options,
             )
             last += step
             response += res
@@ -302,10 +353,14 @@ class BaseModel:
         else:
             return self._name + 's'
 
-    def _prepare_save_vals(self):
-        if self.id:
+    def _prepare_save_vals(self, schema=None):
+        """
+        `schema` may be passed to skip the request, e.g. when the same blank schema
+        is reused for many new records
+        """
+        if schema is None and self.id:
             schema = self._client.get(self._plural_name, self.id)
-        else:
+        elif schema is None:
             schema = self._client.get(
                 self._plural_name, options={'schema': 'blank'}
             )
@@ -1,6 +1,9 @@
 #  See LICENSE file for full copyright and licensing details.
 
+import shutil
 import logging
+from uuid import uuid4
+from tempfile import SpooledTemporaryFile
 from prestapyt import PrestaShopWebServiceDict
 from .base_model import BaseModel
 from .category import Category
@@ -11,6 +14,10 @@ from .image import Image
 
 _logger = logging.getLogger(__name__)
 
+FILE_CHUNK_SIZE = 64 * 1024
+# Bigger files are buffered on disk instead of memory
+FILE_SPOOL_SIZE = 1024 * 1024
+
 
 class Client(PrestaShopWebServiceDict):
 
@@ -39,6 +46,67 @@ class Client(PrestaShopWebServiceDict):
         )
         return super(Client, self).add(resource, content, files, options)
 
+    def add_file(self, resource, key, filename, file_obj, options=None):
+        """
+        Add (POST) a file as multipart/form-data. The body is written into a spooled
+        temporary file and streamed from it, so the file isn't held in memory as a whole
+        """
+        _logger.debug(
+            'add_file() resource=%s, filename=%s, options=%s',
+            resource,
+            filename,
+            options,
+        )
+        url = self._api_url + resource
+        if options:
+            self._validate_query_options(options)
+            url += '?%s' % self._options_to_querystring(options)
+
+        boundary = uuid4().hex
+        headers = {
+            'Content-Type': 'multipart/form-data; boundary=%s' % boundary,
+        }
+
+        with SpooledTemporaryFile(max_size=FILE_SPOOL_SIZE) as body:
+            head = (
+                '--%s\r\n'
+                'Content-Disposition: form-data; name="%s"; filename="%s"\r\n'
+                'Content-Type: %s\r\n\r\n'
+            ) % (boundary, key, filename, self.get_content_type(filename))
+            body.write(head.encode('utf-8'))
+            shutil.copyfileobj(file_obj, body, FILE_CHUNK_SIZE)
+            body.write(('\r\n--%s--\r\n' % boundary).encode('utf-8'))
+            body.seek(0)
+
+            response = self.client.post(url, data=body, headers=headers)
+
+        self._check_status_code(response.status_code, response.content)
+        return self._parse(response.content)
+
+    def download_file(self, url, max_size):
+        """
+        Stream (GET) a file into a spooled temporary file. Return None as soon as
+        the file exceeds `max_size`, without downloading the rest of it
+        """
+        with self.client.get(url, stream=True) as response:
+            if response.status_code not in (200, 201):
+                self._check_status_code(response.status_code, response.content)
+
+            if int(response.headers.get('Content-Length') or 0) > max_size:
+                return None
+
+            result = SpooledTemporaryFile(max_size=FILE_SPOOL_SIZE)
+            size = 0
+            for chunk in response.iter_content(chunk_size=FILE_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    result.close()
+                    return None
+                result.write(chunk)
+
+        result.seek(0)
+        return result
+
     def edit(self, resource, content, options=None):
         _logger.debug(
             'edit() resource=%s, content=%s, options=%s',
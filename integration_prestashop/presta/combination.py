@@ -7,6 +7,11 @@ class Combination(BaseModel):
 
     _product_id = None
 
+    _price_fields = [
+        'price',
+        'wholesale_price',
+    ]
+
     def _save(self, vals):
         is_update = bool(self.id)
         result = super()._save(vals)
@@ -27,10 +32,10 @@ class Combination(BaseModel):
     def product_id(self, value):
         self._product_id = value
 
-    def _prepare_save_vals(self):
+    def _prepare_save_vals(self, schema=None):
         product_option_values_to_update = self._to_update.pop('product_option_values', None)
 
-        combination_schema = super()._prepare_save_vals()
+        combination_schema = super()._prepare_save_vals(schema)
 
         if product_option_values_to_update is not None:
             option_values = \
@@ -47,9 +52,11 @@ class Combination(BaseModel):
     def _thirtybees_forcibly_update_price_per_shop(self, combination):
         # Some bug on Thirtybees doesn't allow us update price when id_group_shop
         # is set. It just doesn't save price at all. But it works ok with PrestaShop.
-        # So we update price per shop as workaround
-        for shop_id in self._shop_ids:
-            self._client.edit('combinations', combination, options={'id_shop': shop_id})
+        # So we update price per shop as workaround. Only price fields are sent,
+        # the rest of the record was already saved by the main request
+        price_vals = self._get_price_vals(combination)
+        if price_vals:
+            self.edit_fields_per_shop(price_vals)
 
     def delete(self):
         delete_url = self._client._api_url + 'combinations/' + str(self.id)
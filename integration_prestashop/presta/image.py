@@ -10,11 +10,24 @@ class Image(BaseModel):
     _product_id = None
 
     def create(self, name, data):
+        return self.upload(name, base64.b64decode(data))
+
+    def upload(self, name, content):
         result = self._client.add('images/products/' + str(self._product_id), files=[
-            ('image', name, base64.b64decode(data))
+            ('image', name, content)
         ], options=self._id_group_shop_options)
         return result[PRESTASHOP]['image']['id']
 
+    def upload_file(self, name, file_obj):
+        result = self._client.add_file(
+            'images/products/' + str(self._product_id),
+            'image',
+            name,
+            file_obj,
+            options=self._id_group_shop_options,
+        )
+        return result[PRESTASHOP]['image']['id']
+
     def delete(self):
         product_images_full_url = (
             self._client._api_url
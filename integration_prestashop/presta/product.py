@@ -17,6 +17,11 @@ class Product(BaseModel):
         'state',
     ]
 
+    _price_fields = [
+        'price',
+        'wholesale_price',
+    ]
+
     def _save(self, vals):
         is_update = bool(self.id)
         result = super()._save(vals)
@@ -27,17 +32,19 @@ class Product(BaseModel):
     def _thirtybees_forcibly_update_price_per_shop(self, vals):
         # Some bug on Thirtybees doesn't allow us update price when id_group_shop
         # is set. It just doesn't save price at all. But it works ok with PrestaShop.
-        # So we update price per shop as workaround
-        for shop_id in self._shop_ids:
-            self._client.edit('products', vals, options={'id_shop': shop_id})
+        # So we update price per shop as workaround. Only price fields are sent,
+        # the rest of the record was already saved by the main request
+        price_vals = self._get_price_vals(vals)
+        if price_vals:
+            self.edit_fields_per_shop(price_vals)
 
-    def _prepare_save_vals(self):
+    def _prepare_save_vals(self, schema=None):
         categories_to_update = self._to_update.pop('categories', None)
         product_bundle_to_update = self._to_update.pop('product_bundle', None)
         product_features_to_update = self._to_update.pop('product_features', None)
         product_relations_to_update = self._to_update.pop('accessories', None)
 
-        product_schema = super()._prepare_save_vals()
+        product_schema = super()._prepare_save_vals(schema)
 
         if categories_to_update is not None:
             categories = product_schema['product']['associations']['categories']
@@ -144,7 +151,25 @@ class Product(BaseModel):
 
         return result
 
+    def delete_images(self, image_ids):
+        for image_id in image_ids:
+            image = Image(
+                self._client, self._id_group_shop, self._shop_ids
+            ).get(image_id)
+            image._product_id = self.id
+            image.delete()
+
     def add_image(self, data):
         new_image = Image(self._client, self._id_group_shop, self._shop_ids)
         new_image._product_id = self.id  # todo: bad
         return new_image.create('image.jpg', data)  # todo: image name
+
+    def add_image_content(self, content):
+        new_image = Image(self._client, self._id_group_shop, self._shop_ids)
+        new_image._product_id = self.id
+        return new_image.upload('image.jpg', content)  # todo: image name
+
+    def add_image_file(self, file_obj):
+        new_image = Image(self._client, self._id_group_shop, self._shop_ids)
+        new_image._product_id = self.id
+        return new_image.upload_file('image.jpg', file_obj)  # todo: image name
@@ -1,13 +1,20 @@
 # See LICENSE file for full copyright and licensing details.
 
+import io
 import json
+import time
+import pytz
+import base64
 import itertools
 import logging
+from datetime import datetime, timedelta
 from decimal import Decimal
 from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor
 from itertools import groupby
 
 from prestapyt import PrestaShopWebServiceError
+from requests.exceptions import ConnectTimeout, RequestException
 
 from odoo import _
 from odoo.addons.integration.api.abstract_apiclient import AbsApiClient
@@ -30,6 +37,19 @@ PRODUCT_TYPE_MAP = {
     'virtual': 'service',
 }
 ROOT_CMS_PAGE_CATEGORY_ID = '1'
+IMAGE_TRANSFER_WORKERS = 4
+IMAGE_TRANSFER_ATTEMPTS = 3
+IMAGE_DOWNLOAD_RETRY_EXCEPTIONS = (PrestaShopWebServiceError, RequestException)
+# Upload is not idempotent: it's repeated only if the request surely wasn't sent
+IMAGE_UPLOAD_RETRY_EXCEPTIONS = (ConnectTimeout,)
+IMAGE_MAX_SIZE = 20 * 1024 * 1024  # 20 MB
+COMBINATION_EXPORT_WORKERS = 4
+PRICE_EXPORT_WORKERS = 4
+RECORD_EXPORT_WORKERS = 4
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+MIN_DATETIME = '0000-00-00 00:00:00'
+MAX_DATETIME = '9999-12-31 23:59:59'
+ID_FILTER_BLOCK_SIZE = 200
 
 
 # TODO: all reading through pagination
@@ -54,6 +74,14 @@ class PrestaShopApiClient(AbsApiClient):
         ('import_products_filter', 'Import Products Filter', '{"active": "1"}'),
         ('id_group_shop', 'Shop Group where export products', ''),
         ('shop_ids', 'Shop ids in id_group_shop separated by comma', ''),
+        (
+            'receive_orders_overlap',
+            (
+                'Receive Orders Overlap (minutes).'
+                ' Orders updated this time before the latest received order are checked again'
+            ),
+            '10',
+        ),
         (
             'PS_TIMEZONE',
             (
@@ -95,6 +123,9 @@ class PrestaShopApiClient(AbsApiClient):
         self._client.shop_ids = shop_ids
         self._client.data_block_size = self._settings['data_block_size']
 
+        # The latest date_upd in the last listing of orders to receive
+        self.orders_listing_date_upd = None
+
     def check_connection(self):
         resources = self._client.get('')
         connection_ok = bool(resources)
@@ -466,6 +497,32 @@ class PrestaShopApiClient(AbsApiClient):
 
         return template_ids and [x['id'] for x in template_ids] or []
 
+    def get_updated_product_template_ids(self, date_from):
+        ps_timezone = self.get_settings_value('PS_TIMEZONE')
+        if ps_timezone:
+            date_from = pytz.utc.localize(date_from).astimezone(pytz.timezone(ps_timezone))
+
+        product_filter = self._get_product_filter_hook({
+            'date_upd': '>[%s]' % date_from.strftime(DATETIME_FORMAT),
+        })
+
+        template_ids = self._client.model('product').search_read_by_blocks(
+            filters=product_filter,
+            fields=self._get_product_fields_hook(['id']),
+            options={'date': IS_TRUE},
+        )
+
+        template_ids = self._filter_templates_hook(template_ids)
+
+        return [x['id'] for x in template_ids]
+
+    def get_all_product_template_ids(self):
+        template_ids = self._client.model('product').search_read_by_blocks(
+            filters={},
+            fields=['id'],
+        )
+        return [x['id'] for x in template_ids]
+
     def get_product_templates(self, template_ids):
         product_templates = self._client.model('product').search_read(
             filters={'id': '[%s]' % '|'.join(template_ids)},
@@ -541,15 +598,141 @@ class PrestaShopApiClient(AbsApiClient):
         presta_category = self._client.model('category').create(category)
         return presta_category.id
 
+    def get_products_mirror_data(self, template_ids=None):
+        """
+        Rows for the local mirror of products: one row per product (with combination '0')
+        and one row per its combination. Without ids all the products are read
+        """
+        if template_ids is None:
+            return self._get_products_mirror_rows({})
+
+        template_ids = [str(x) for x in template_ids]
+        rows = []
+        for index in range(0, len(template_ids), ID_FILTER_BLOCK_SIZE):
+            block = template_ids[index:index + ID_FILTER_BLOCK_SIZE]
+            rows.extend(self._get_products_mirror_rows({'id': '[%s]' % '|'.join(block)}))
+
+        return rows
+
+    def _get_products_mirror_rows(self, product_filter):
+        templates = self._client.model('product').search_read_by_blocks(
+            filters=self._get_product_filter_hook(product_filter),
+            fields=self._get_product_fields_hook(['id', 'reference', 'ean13']),
+        )
+        templates = self._filter_templates_hook(templates)
+        if not templates:
+            return []
+
+        combination_filter = {}
+        if product_filter:
+            combination_filter['id_product'] = '[%s]' % '|'.join(x['id'] for x in templates)
+
+        # Full display to receive option values of the combinations
+        combinations = self._client.model('combination').search_read_by_blocks(
+            filters=self._get_combination_filter_hook(combination_filter),
+        )
+
+        rows = [
+            {
+                'product_code': x['id'],
+                'combination_code': IS_FALSE,
+                'reference': x['reference'] or False,
+                'barcode': x['ean13'] or False,
+            }
+            for x in templates
+        ]
+
+        template_ids = {x['id'] for x in templates}
+        for combination in combinations:
+            if combination['id_product'] not in template_ids:
+                continue
+
+            rows.append({
+                'product_code': combination['id_product'],
+                'combination_code': combination['id'],
+                'reference': combination['reference'] or False,
+                'barcode': combination['ean13'] or False,
+                'option_value_codes': ','.join(self._get_option_value_ids(combination)),
+            })
+
+        return rows
+
+    @staticmethod
+    def _get_option_value_ids(combination):
+        option_values = combination.get('associations', {})\
+            .get('product_option_values', {}).get('product_option_value', [])
+
+        if isinstance(option_values, dict):
+            option_values = [option_values]
+
+        return [x['id'] for x in option_values]
+
+    def _get_product_mirror(self):
+        """
+        Local mirror of PrestaShop products, None if it's not built yet
+        """
+        if not self._env or not self.integration.presta_product_mirror_datetime:
+            return None
+        return self._env['integration.prestashop.product.mirror']
+
+    def _get_template_hub_from_mirror(self, product_mirror, product_refs):
+        rows = product_mirror.find_by_references(self.integration, product_refs)
+        products_with_variants = set(
+            rows.filtered(lambda x: x.combination_code != IS_FALSE).mapped('product_code')
+        )
+
+        return TemplateHub([
+            (
+                row.product_code if row.combination_code == IS_FALSE else row.combination_code,
+                row.barcode or str(),
+                row.reference or str(),
+                str() if row.combination_code == IS_FALSE else row.product_code,
+                row.combination_code == IS_FALSE and row.product_code in products_with_variants,
+            )
+            for row in rows
+        ])
+
     def find_existing_template(self, template):
         # we try to search existing product template ONLY if there is no external_id for it
         # If there is external ID then we already mapped products and we do not need to search
         if template['external_id']:
             return False
 
-        # Now let's validate if there are no duplicated references in Prestashop
         product_refs = [str(x['reference']) for x in template['products']]
+
+        # The mirror is kept up to date by the product webhooks and the refresh cron, so
+        # a miss is trusted and the first export of a product doesn't search PrestaShop.
+        # But a hit may be stale (reference fixed or product deleted after the last
+        # refresh), so it's confirmed with PrestaShop before any error is raised
+        product_mirror = self._get_product_mirror()
+        if product_mirror is not None:
+            tmpl_hub = self._get_template_hub_from_mirror(product_mirror, product_refs)
+            if not tmpl_hub.product_list:
+                return False
+
+            try:
+                presta_product_id = self._check_existing_template(template, product_refs, tmpl_hub)
+            except UserError:
+                presta_product_id = False
+
+            # Existence of a product with variants is confirmed by reading its combinations
+            if presta_product_id and (
+                any(x['attribute_values'] for x in template['products'])
+                or self._is_existing_product(presta_product_id)
+            ):
+                return presta_product_id
+
         tmpl_hub = self.get_templates_and_products_for_validation_test(product_refs)
+        return self._check_existing_template(template, product_refs, tmpl_hub)
+
+    def _is_existing_product(self, product_id):
+        return bool(self._client.model('product').search_read(
+            filters={'id': product_id},
+            fields=['id'],
+        ))
+
+    def _check_existing_template(self, template, product_refs, tmpl_hub):
+        # Now let's validate if there are no duplicated references in Prestashop
         duplicated_ref = tmpl_hub.get_dupl_refs()
         if duplicated_ref:
             error_message = _('Duplicated references in Prestashop (below showed <reference>:'
@@ -560,7 +743,7 @@ class PrestaShopApiClient(AbsApiClient):
             raise UserError(error_message)
 
         # Let's validate if all found products belong to the same product template
-        ids_set = self._find_product_by_references(product_refs)
+        ids_set = {str(x.parent_id or x.id) for x in tmpl_hub}
 
         # If nothing found, then just return False
         if len(ids_set) == 0:
@@ -582,9 +765,11 @@ class PrestaShopApiClient(AbsApiClient):
 
         presta_product_id = list(ids_set)[0]
 
-        # Check if products in Odoo has the same amount of variants as in Prestashop
-        product = self._client.model('product').get(presta_product_id)
-        product_combinations = product.get_combinations()
+        # Check if products in Odoo has the same amount of variants as in Prestashop.
+        # Combinations are always read from PrestaShop, with a single request
+        product_combinations = self._client.model('combination').search_read(
+            filters={'id_product': presta_product_id},
+        )
         # counting expected variants excluding "virtual" variant
         template_variants_count = len([x for x in template['products'] if x['attribute_values']])
         if template_variants_count != len(product_combinations):
@@ -601,23 +786,19 @@ class PrestaShopApiClient(AbsApiClient):
             )
         for combination in product_combinations:
             # Make sure that reference is set on the combination
-            if str(combination.id) != IS_FALSE and not combination.reference:
+            if str(combination['id']) != IS_FALSE and not combination['reference']:
                 error_message = _('Product with id "%s" do not have references on '
                                   'all combinations. Please, add them and relaunch '
                                   'product export') % presta_product_id
                 raise UserError(error_message)
-            attribute_values_from_presta = combination.associations \
-                .get('product_option_values', {}).get('product_option_value', [])
-            if isinstance(attribute_values_from_presta, dict):
-                attribute_values_from_presta = [attribute_values_from_presta]
-            attribute_values_from_presta = [x['id'] for x in attribute_values_from_presta]
+            attribute_values_from_presta = self._get_option_value_ids(combination)
             attribute_values_from_odoo = list(
-                filter(lambda x: x['reference'] == combination.reference, template['products'])
+                filter(lambda x: x['reference'] == combination['reference'], template['products'])
             )
             if len(attribute_values_from_odoo) == 0:
                 error_message = \
                     _('There is no variant in Odoo with reference "%s" that corresponds to '
-                      'Prestashop product %s') % (combination.reference, presta_product_id)
+                      'Prestashop product %s') % (combination['reference'], presta_product_id)
                 raise UserError(error_message)
             attribute_values_from_odoo = \
                 [x['external_id'] for x in attribute_values_from_odoo[0]['attribute_values']]
@@ -627,7 +808,7 @@ class PrestaShopApiClient(AbsApiClient):
                       'Odoo Variant has attribute values %s. Products in Prestashop and Odoo '
                       'with the same reference should have the same combination of attributes.') \
                     % (
-                        combination.reference,
+                        combination['reference'],
                         attribute_values_from_presta,
                         attribute_values_from_odoo,
                     )
@@ -635,58 +816,65 @@ class PrestaShopApiClient(AbsApiClient):
 
         return presta_product_id
 
-    def _find_product_by_references(self, product_refs):
-        if product_refs and not isinstance(product_refs, list):
-            product_refs = [str(product_refs)]
+    def validate_template(self, template):
+        return self.validate_templates([template])
 
-        reference_filter = {'reference': '[%s]' % '|'.join(product_refs)}
-        product_fields = ['id', 'name', 'reference']
-        combination_fields = ['id', 'id_product', 'reference']
-        templates, variants = self._get_products_and_variants(product_fields,
-                                                              combination_fields,
-                                                              reference_filter)
+    def validate_templates(self, templates):
+        """
+        Same checks as `validate_template()` but for several templates at once: all product
+        ids and all combination ids are checked with one `filter[id]=[a|b|c]` request each
+        """
+        product_ids = set()
+        combination_ids = dict()
 
-        ids_set = set()
-        ids_set.update([str(x['id']) for x in templates])
-        ids_set.update([str(x['id_product']) for x in variants])
-        return ids_set
+        for template in templates:
+            presta_product_id = template['external_id']
+            if presta_product_id:
+                product_ids.add(str(presta_product_id))
+
+            for variant in template['products']:
+                variant_ext_id = variant['external_id']
+                if not variant_ext_id:
+                    continue
+                product_id, presta_combination_id = variant_ext_id.split('-')
+                if presta_combination_id != IS_FALSE:
+                    combination_ids[presta_combination_id] = str(variant_ext_id)
 
-    def validate_template(self, template):
         mappings_to_delete = []
 
         # (1) if template with such external id exists?
-        presta_product_id = template['external_id']
-        if presta_product_id:
-            presta_product = self._client.model('product').search_read(
-                filters={'id': presta_product_id},
-                fields=['id']
-            )
-            if len(presta_product) == 0:
+        existing_product_ids = self._get_existing_ids('product', product_ids)
+        for presta_product_id in sorted(product_ids - existing_product_ids):
+            mappings_to_delete.append({
+                'model': 'product.template',
+                'external_id': presta_product_id,
+            })
+
+        # (2) if variant with such external id exists?
+        existing_combination_ids = self._get_existing_ids('combination', combination_ids)
+        for presta_combination_id, variant_ext_id in combination_ids.items():
+            if presta_combination_id not in existing_combination_ids:
                 mappings_to_delete.append({
-                    'model': 'product.template',
-                    'external_id': str(presta_product_id),
+                    'model': 'product.product',
+                    'external_id': variant_ext_id,
                 })
 
-        # (2) if variant with such external id exists?
-        for variant in template['products']:
-            variant_ext_id = variant['external_id']
-            if not variant_ext_id:
-                continue
-            product_id, presta_combination_id = variant_ext_id.split('-')
-            if presta_combination_id == IS_FALSE:
-                presta_combination_id = None
-            if presta_combination_id:
-                presta_combination = self._client.model('combination').search_read(
-                    filters={'id': presta_combination_id},
-                    fields=['id']
-                )
-                if len(presta_combination) == 0:
-                    mappings_to_delete.append({
-                        'model': 'product.product',
-                        'external_id': str(variant_ext_id),
-                    })
         return mappings_to_delete
 
+    def _get_existing_ids(self, model_name, ids):
+        ids = sorted(ids)
+        existing_ids = set()
+
+        for index in range(0, len(ids), ID_FILTER_BLOCK_SIZE):
+            block = ids[index:index + ID_FILTER_BLOCK_SIZE]
+            records = self._client.model(model_name).search_read(
+                filters={'id': '[%s]' % '|'.join(block)},
+                fields=['id'],
+            )
+            existing_ids.update(str(x['id']) for x in records)
+
+        return existing_ids
+
     def export_template(self, template):
         mappings = []
 
@@ -713,8 +901,9 @@ class PrestaShopApiClient(AbsApiClient):
             stock.out_of_stock = IS_TRUE
             stock.save()
 
-        for variant in template['products']:
-            combination_id = self._export_product(product.id, variant)
+        variants = template['products']
+        combination_ids = self._export_products(product.id, variants)
+        for variant, combination_id in zip(variants, combination_ids):
             mappings.append({
                 'model': 'product.product',
                 'id': variant['id'],
@@ -841,29 +1030,134 @@ class PrestaShopApiClient(AbsApiClient):
         for lang_id, translation in value.items():
             setattr(model.lang(lang_id), field, translation or '')
 
-    def _export_product(self, presta_product_id, product):
-        if product['external_id']:
-            product_id, combination_id = product['external_id'].split('-')
-            if combination_id == IS_FALSE:
-                combination_id = None
-        else:
-            product_id, combination_id = presta_product_id, None  # TODO: refactor
+    def _export_products(self, presta_product_id, variants):
+        """
+        Create and update all combinations of the product in one go. New combinations are
+        filled from a single `schema=blank` response, existing ones from a single batched
+        read instead of a GET per combination. Payloads are built sequentially (hooks may
+        use Odoo environment). Only updates are sent concurrently: PrestaShop recalculates
+        default combination and stock of the product on every add, so adds go one by one.
 
-        if combination_id:
-            combination = self._client.model('combination').get(combination_id)
-            self._fill_combination(combination, product, product_id)
-            combination.save()
-        else:
-            combination = self._client.model('combination')
-            prestashop_product = self._client.model('product').get(product_id)
-            if product['attribute_values']:
-                self._fill_combination(combination, product, product_id)
-                combination = prestashop_product.add_combination(combination)
+        :return: combination ids in the same order as `variants`
+        """
+        combination_ids = [None] * len(variants)
+        to_create = []
+        to_update = {}
+
+        for index, variant in enumerate(variants):
+            if variant['external_id']:
+                product_id, combination_id = variant['external_id'].split('-')
+            else:
+                product_id, combination_id = presta_product_id, IS_FALSE  # TODO: refactor
+
+            if combination_id != IS_FALSE:
+                to_update[combination_id] = (index, variant, product_id)
+            elif variant['attribute_values']:
+                to_create.append((index, variant, product_id))
+            else:
+                combination_ids[index] = IS_FALSE  # todo: clarify
+
+        Combination = self._client.model('combination')
+        to_update_list = []
+        to_create_list = []
+
+        if to_update:
+            existing_ids = list(to_update)
+            existing = {}
+            for index in range(0, len(existing_ids), ID_FILTER_BLOCK_SIZE):
+                block = existing_ids[index:index + ID_FILTER_BLOCK_SIZE]
+                records = Combination.search_read(
+                    filters={'id': '[%s]' % '|'.join(block)},
+                    skip_translation=True,
+                )
+                existing.update((str(x['id']), x) for x in records)
+
+            for combination_id, (index, variant, product_id) in to_update.items():
+                combination = Combination.get(combination_id)
+                schema = None
+                if combination_id in existing:
+                    combination._data = existing[combination_id]
+                    schema = {Combination._name: existing[combination_id]}
+
+                self._fill_combination(combination, variant, product_id)
+                # Per-shop price requests run inside this pool, so they aren't parallelized
+                # once more, which keeps the total amount of concurrent requests bounded
+                combination._shop_edit_workers = 1
+                to_update_list.append((index, combination, schema))
+
+        if to_create:
+            blank_schema = {Combination._name: Combination.blank()}
+
+            for index, variant, product_id in to_create:
+                combination = self._client.model('combination')
+                combination._product_id = product_id
+                self._fill_combination(combination, variant, product_id)
+                to_create_list.append((index, combination, blank_schema))
+
+        def _save(item):
+            index, combination, schema = item
+            combination.save(schema)
+            combination_ids[index] = combination.id
+
+        # All updates are finished before an error is raised, so no update is
+        # interrupted halfway by a failure of another one
+        with ThreadPoolExecutor(max_workers=COMBINATION_EXPORT_WORKERS) as executor:
+            futures = [executor.submit(_save, x) for x in to_update_list]
+        for future in futures:
+            future.result()
+
+        created = []
+        try:
+            for item in to_create_list:
+                _save(item)
+                created.append(item[1])
+        except Exception:
+            # Combinations added by this call wouldn't be mapped and the next export
+            # would add them again, so they are removed before the error is raised
+            for combination in created:
+                try:
+                    combination.delete()
+                except (PrestaShopWebServiceError, RequestException) as ex:
+                    _logger.warning(
+                        'Prestashop: failed to remove combination %s: %s', combination.id, ex
+                    )
+            raise
+
+        return combination_ids
+
+    def export_prices(self, prices):
+        """
+        Push prices without a full template export. Only price fields are sent, once per
+        shop when `shop_ids` are configured. Variants of the simple products (`<id>-0`)
+        are skipped, their price is the price of the template.
+        """
+        shop_ids = self._client.shop_ids or [None]
+        edits = []
+
+        for price in prices:
+            external_id = str(price['external_id'])
+            if '-' in external_id:
+                model_name = 'combination'
+                record_id = external_id.split('-')[1]
+                if record_id == IS_FALSE:
+                    continue
             else:
-                combination.id = IS_FALSE  # todo: clarify
-                pass  # update template with some values
+                model_name, record_id = 'product', external_id
+
+            record = self._client.model(model_name).get(record_id)
+            vals = {
+                x: round(price[x], record.PRESTASHOP_PRECISION)
+                for x in record._price_fields if x in price
+            }
+            if vals:
+                edits.extend((record, vals, x) for x in shop_ids)
+
+        def _edit(edit):
+            record, vals, shop_id = edit
+            record.edit_fields(vals, shop_id)
 
-        return combination.id
+        with ThreadPoolExecutor(max_workers=PRICE_EXPORT_WORKERS) as executor:
+            list(executor.map(_edit, edits))
 
     def _export_variant_custom_field_hook(self, presta_variant, variant_vals):
         # Method to extend when you would like to add custom fields in order
@@ -902,36 +1196,71 @@ class PrestaShopApiClient(AbsApiClient):
 
         self._export_variant_custom_field_hook(combination, vals)
 
+    def get_product_image_ids(self, product_code):
+        product = self._client.model('product').get(product_code)
+        return [str(x.id) for x in product.get_images()]
+
     def export_images(self, images):  # todo: naming
         product_id = images['template']['id']
         variant = self._client.model('product').get(product_id)
 
-        presta_images = variant.get_images()
-        for image in presta_images:
-            image.delete()
+        variant.delete_images(images['delete'])
+
+        def _upload(image):
+            # The image is streamed from the file, not read in memory as a whole
+            if image.get('path'):
+                with open(image['path'], 'rb') as f:
+                    return str(variant.add_image_file(f))
+
+            return str(variant.add_image_file(io.BytesIO(base64.b64decode(image['data']))))
+
+        # Images are uploaded one by one: their positions in PrestaShop follow the order
+        # of the uploads and the first uploaded image becomes the cover
+        result = {}
+        for image in images['upload']:
+            result[image['checksum']] = self._transfer_image(
+                _upload, image, IMAGE_UPLOAD_RETRY_EXCEPTIONS,
+            )
+
+        return result
 
-        template_default_image = images['template']['default']
-        if template_default_image:
-            default_image = template_default_image['data']
-            variant.add_image(default_image)
+    def _transfer_image(self, func, item, retry_exceptions):
+        for attempt in range(1, IMAGE_TRANSFER_ATTEMPTS + 1):
+            try:
+                return func(item)
+            except retry_exceptions as ex:
+                if attempt == IMAGE_TRANSFER_ATTEMPTS or not self._is_transient_error(ex):
+                    raise ex
 
-        for extra_image in images['template']['extra']:
-            extra_image_data = extra_image['data']
-            variant.add_image(extra_image_data)
+                _logger.warning(
+                    'Prestashop: image transfer failed (attempt %s): %s', attempt, ex
+                )
+                time.sleep(attempt)
 
-        for product in images['products']:
-            product_default_image = product['default']
-            if product_default_image:
-                product_image = product_default_image['data']
-                variant.add_image(product_image)
+    @staticmethod
+    def _is_transient_error(ex):
+        # Client errors (e.g. 404 for a removed image) will not pass on the next attempt
+        error_code = getattr(ex, 'error_code', None)
+        return not (error_code and 400 <= int(error_code) < 500)
 
-            for product_extra_image in product['extra']:
-                product_extra_image_data = product_extra_image['data']
-                variant.add_image(product_extra_image_data)
+    def _transfer_images(self, func, items):
+        if len(items) < 2:
+            return [func(x) for x in items]
+
+        with ThreadPoolExecutor(max_workers=IMAGE_TRANSFER_WORKERS) as executor:
+            return list(executor.map(func, items))
 
     def export_attribute(self, attribute):
         product_option = self._client.model('product_option')
+        self._fill_product_option(product_option, attribute)
+        product_option.save()
 
+        return product_option.id
+
+    def export_attributes(self, attributes):
+        return self._create_records('product_option', self._fill_product_option, attributes)
+
+    def _fill_product_option(self, product_option, attribute):
         self._fill_translated_field(
             product_option,
             'name',
@@ -945,13 +1274,22 @@ class PrestaShopApiClient(AbsApiClient):
         )
 
         product_option.group_type = 'select'
-        product_option.save()
-
-        return product_option.id
 
     def export_attribute_value(self, attribute_value):
         product_option_value = self._client.model('product_option_value')
+        self._fill_product_option_value(product_option_value, attribute_value)
+        product_option_value.save()
+
+        return product_option_value.id
 
+    def export_attribute_values(self, attribute_values):
+        return self._create_records(
+            'product_option_value',
+            self._fill_product_option_value,
+            attribute_values,
+        )
+
+    def _fill_product_option_value(self, product_option_value, attribute_value):
         self._fill_translated_field(
             product_option_value,
             'name',
@@ -959,26 +1297,39 @@ class PrestaShopApiClient(AbsApiClient):
         )
 
         product_option_value.id_attribute_group = attribute_value['attribute']
-        product_option_value.save()
-
-        return product_option_value.id
 
     def export_feature(self, feature):
         product_feature = self._client.model('product_feature')
+        self._fill_product_feature(product_feature, feature)
+        product_feature.save()
 
+        return product_feature.id
+
+    def export_features(self, features):
+        return self._create_records('product_feature', self._fill_product_feature, features)
+
+    def _fill_product_feature(self, product_feature, feature):
         self._fill_translated_field(
             product_feature,
             'name',
             feature['name'],
         )
 
-        product_feature.save()
-
-        return product_feature.id
-
     def export_feature_value(self, feature_value):
         product_feature_value = self._client.model('product_feature_value')
+        self._fill_product_feature_value(product_feature_value, feature_value)
+        product_feature_value.save()
 
+        return product_feature_value.id
+
+    def export_feature_values(self, feature_values):
+        return self._create_records(
+            'product_feature_value',
+            self._fill_product_feature_value,
+            feature_values,
+        )
+
+    def _fill_product_feature_value(self, product_feature_value, feature_value):
         self._fill_translated_field(
             product_feature_value,
             'value',
@@ -986,11 +1337,167 @@ class PrestaShopApiClient(AbsApiClient):
         )
 
         product_feature_value.id_feature = feature_value['feature_id']
-        product_feature_value.save()
 
-        return product_feature_value.id
+    def _create_records(self, model_name, fill, items):
+        """
+        Create several records of the same model: the blank schema is requested once
+        and the records are sent concurrently. If any of them fails, the records created
+        by this call are removed before the error is raised: they wouldn't be mapped and
+        the next export would create them again.
+
+        :return: ids of the created records in the order of `items`
+        """
+        if not items:
+            return []
+
+        Model = self._client.model(model_name)
+        blank_schema = {Model._name: Model.blank()}
+
+        records = []
+        for vals in items:
+            record = self._client.model(model_name)
+            fill(record, vals)
+            records.append(record)
+
+        def _save(record):
+            record.save(blank_schema)
+            return record.id
+
+        with ThreadPoolExecutor(max_workers=RECORD_EXPORT_WORKERS) as executor:
+            futures = [executor.submit(_save, x) for x in records]
+
+        errors = [x.exception() for x in futures if x.exception()]
+        if not errors:
+            return [x.result() for x in futures]
+
+        for record, future in zip(records, futures):
+            if future.exception():
+                continue
+            try:
+                record.delete()
+            except (PrestaShopWebServiceError, RequestException) as ex:
+                _logger.warning(
+                    'Prestashop: failed to remove %s %s: %s', model_name, record.id, ex
+                )
+
+        raise errors[0]
 
     def receive_orders(self):
+        orders = self._search_orders_by_blocks(self._get_receive_orders_options())
+
+        # The watermark is advanced from the whole listing. Otherwise it stalls, when only
+        # already received orders are changed, and the same window is read again and again
+        self.orders_listing_date_upd = max((x['date_upd'] for x in orders), default=None)
+
+        # The search overlaps with the previous runs. Orders that were already received
+        # are dropped here, before the expensive download of the order data
+        received_ids = self.integration.get_received_order_ids([x['id'] for x in orders])
+        orders = [x for x in orders if str(x['id']) not in received_ids]
+
+        input_files = []
+        for order in orders:
+            order_id = order['id']
+            data = self._get_input_file_data(order_id)
+            input_file = {
+                'id': order_id,
+                'data': data,
+            }
+            input_files.append(input_file)
+
+        return input_files
+
+    def _search_orders_by_blocks(self, options):
+        """
+        Keyset pagination by (date_upd, id) within the date_upd range of the receive orders
+        filter. Every next block starts right after the last listed order: first the rest of
+        the orders with the same date_upd, then the orders with greater date_upd. An order
+        updated during the fetch moves to the end of the listing and doesn't shift the blocks
+        """
+        step = self._client.data_block_size
+        options = dict(options, display='[id,date_upd]')
+        date_from, date_to = self._parse_date_filter(options.pop('filter[date_upd]', None))
+
+        orders = {}
+        cursor = None
+        while not (date_from and date_to and date_from > date_to):
+            if cursor:
+                last_date, last_id = cursor
+                block = self._search_orders(dict(options, **{
+                    'filter[date_upd]': '[%s]' % last_date,
+                    'filter[id]': '>[%s]' % last_id,
+                    'sort': '[id_ASC]',
+                    'limit': step,
+                }))
+            else:
+                block_options = dict(options, sort='[date_upd_ASC,id_ASC]', limit=step)
+                date_filter = self._format_date_filter(date_from, date_to)
+                if date_filter:
+                    block_options['filter[date_upd]'] = date_filter
+                block = self._search_orders(block_options)
+
+            for order in block:
+                orders.setdefault(order['id'], order)
+
+            if len(block) == step:
+                cursor = (block[-1]['date_upd'], block[-1]['id'])
+            elif cursor:
+                # All orders with the last date_upd are received, continue with the later ones
+                date_from = self._shift_datetime(cursor[0], seconds=1)
+                cursor = None
+            else:
+                break
+
+        return list(orders.values())
+
+    @staticmethod
+    def _shift_datetime(value, seconds):
+        value = datetime.strptime(value, DATETIME_FORMAT) + timedelta(seconds=seconds)
+        return value.strftime(DATETIME_FORMAT)
+
+    def _parse_date_filter(self, value):
+        """
+        Convert PrestaShop date filter into inclusive (date_from, date_to) bounds
+        """
+        value = (value or '').strip()
+        if not value or value in ('>[]', '<[]', '[]'):
+            return None, None
+
+        if value.startswith('>[') and value.endswith(']'):
+            return self._shift_datetime(value[2:-1], seconds=1), None
+
+        if value.startswith('<[') and value.endswith(']'):
+            return None, self._shift_datetime(value[2:-1], seconds=-1)
+
+        if value.startswith('[') and value.endswith(']') and '|' not in value:
+            bounds = value[1:-1].split(',')
+            if len(bounds) in (1, 2):
+                return bounds[0].strip() or None, bounds[-1].strip() or None
+
+        raise UserError(
+            _('Filter "%s" by date_upd in the receive_orders_filter is not supported. '
+              'Use ">[date]", "<[date]", "[date]" or "[date_from,date_to]"') % value
+        )
+
+    @staticmethod
+    def _format_date_filter(date_from, date_to):
+        if not date_from and not date_to:
+            return None
+        return '[%s,%s]' % (date_from or MIN_DATETIME, date_to or MAX_DATETIME)
+
+    def receive_order(self, order_id):
+        options = self._get_receive_orders_options()
+        options['filter[id]'] = '[%s]' % order_id
+
+        # The order is received only if it satisfies the receive orders filter
+        if not self._search_orders(options):
+            return None
+
+        return {
+            'id': str(order_id),
+            'data': self._get_input_file_data(order_id),
+        }
+
+    def _get_receive_orders_options(self):
         options = {
             'date': IS_TRUE,
         }
@@ -1007,6 +1514,9 @@ class PrestaShopApiClient(AbsApiClient):
                 filters
             )
 
+        return options
+
+    def _search_orders(self, options):
         orders = self._client.get('orders', options=options)['orders']
         if orders:
             orders = orders['order']
@@ -1016,17 +1526,7 @@ class PrestaShopApiClient(AbsApiClient):
         if not isinstance(orders, list):
             orders = [orders]
 
-        input_files = []
-        for order in orders:
-            order_id = order['attrs']['id']
-            data = self._get_input_file_data(order_id)
-            input_file = {
-                'id': order['attrs']['id'],
-                'data': data,
-            }
-            input_files.append(input_file)
-
-        return input_files
+        return orders
 
     def _get_messages_list(self, order_id):
         options = {
@@ -1363,27 +1863,48 @@ class PrestaShopApiClient(AbsApiClient):
         pass
 
     def get_product_for_import(self, product_code, import_images=False):
-        # Get product
-        presta_template = self._client.model('product').search_read(
-            filters={'id': '[%s]' % product_code},
-            skip_translation=True,
-        )
+        product_code = str(product_code)
+        products = self.get_products_for_import([product_code], import_images=import_images)
 
-        if not presta_template:
+        if product_code not in products:
             raise UserError(
                 _('Product with id "%s" does not exist in PrestaShop') % product_code
             )
 
-        if isinstance(presta_template, list):
-            presta_template = presta_template[0]
+        return products[product_code]
+
+    def get_products_for_import(self, product_codes, import_images=False):
+        product_codes = [str(x) for x in product_codes]
+        codes_filter = '[%s]' % '|'.join(product_codes)
+
+        # Get products
+        presta_templates = self._client.model('product').search_read(
+            filters={'id': codes_filter},
+            skip_translation=True,
+        )
 
-        # Get combinations
+        # Get combinations of all products at once
         presta_variants = self._client.model('combination').search_read(
-            filters={'id_product': '[%s]' % product_code},
+            filters={'id_product': codes_filter},
         )
 
-        if not isinstance(presta_variants, list):
-            presta_variants = [presta_variants]
+        variants_by_product = defaultdict(list)
+        for presta_variant in presta_variants:
+            variants_by_product[str(presta_variant['id_product'])].append(presta_variant)
+
+        result = {}
+        for presta_template in presta_templates:
+            product_code = str(presta_template['id'])
+            result[product_code] = self._parse_product_for_import(
+                presta_template,
+                variants_by_product[product_code],
+                import_images,
+            )
+
+        return result
+
+    def _parse_product_for_import(self, presta_template, presta_variants, import_images):
+        product_code = presta_template['id']
 
         # Fill product json
         public_category_ids = presta_template.get('associations', {})\
@@ -1505,20 +2026,39 @@ class PrestaShopApiClient(AbsApiClient):
             if not isinstance(image_list_tmpl, list):
                 image_list_tmpl = [image_list_tmpl]
 
-            image_ids = [image['id'] for image in image_list_tmpl]
+            image_ids = [
+                image['id'] for image in image_list_tmpl
+                if image['id'] and image['id'] != IS_FALSE
+            ]
             bearer_url = f'{self._client._api_url}images/products/{product_code}'
 
-            for image_id in image_ids:
-                if not image_id or image_id == IS_FALSE:
-                    continue
+            def _get_image(image_id):
+                # Streamed, so an image over the size limit is dropped without reading it
+                return self._client.download_file(f'{bearer_url}/{image_id}', IMAGE_MAX_SIZE)
 
+            def _download(image_id):
                 try:
-                    response = self._client._execute(f'{bearer_url}/{image_id}', 'GET')
+                    image_file = self._transfer_image(
+                        _get_image, image_id, IMAGE_DOWNLOAD_RETRY_EXCEPTIONS,
+                    )
                 except PrestaShopWebServiceError:
-                    pass
-                else:
-                    if response.status_code == 200:
-                        images_hub['images'][image_id] = response.content
+                    return None
+
+                if image_file is None:
+                    _logger.warning(
+                        'Prestashop: image %s of the product %s exceeds the size limit. Skipped',
+                        image_id,
+                        product_code,
+                    )
+                    return None
+
+                with image_file:
+                    return image_file.read()
+
+            contents = self._transfer_images(_download, image_ids)
+            for image_id, content in zip(image_ids, contents):
+                if content:
+                    images_hub['images'][image_id] = content
 
         return template, variants, bom_components, images_hub
 
@@ -1603,48 +2143,33 @@ class PrestaShopApiClient(AbsApiClient):
         if product_refs:
             reference_filter_mixin['reference'] = '[%s]' % '|'.join(product_refs)
 
-        def serialize_variant(var):
-            return {
-                'id': var['id'],
-                'barcode': var['ean13'],
-                'ref': var['reference'],
-                'parent_id': var['id_product'],
-                'skip_ref': False,
-            }
-
-        def serialize_template(tmpl):
-            return {
-                'id': tmpl['id'],
-                'barcode': tmpl['ean13'],
-                'ref': tmpl['reference'],
-                'parent_id': str(),
-                'skip_ref': False,
-            }
-
         product_fields = ['id', 'ean13', 'reference']
         combination_fields = ['id', 'id_product', 'reference', 'ean13']
         template_ids, variant_ids = self._get_products_and_variants(product_fields,
                                                                     combination_fields,
                                                                     reference_filter_mixin)
 
+        # Rows in the order of TemplateHub._schema: id, barcode, ref, parent_id, skip_ref
         products_data = defaultdict(list)
-        for tmpl in template_ids:
-            products_data[tmpl['id']].append(
-                serialize_template(tmpl)
-            )
-
         for variant in variant_ids:
-            products_data[variant['id_product']].append(
-                serialize_variant(variant)
-            )
+            products_data[variant['id_product']].append((
+                variant['id'],
+                variant['ean13'],
+                variant['reference'],
+                variant['id_product'],
+                False,
+            ))
+
+        product_rows = []
+        for tmpl in template_ids:
+            # If there is at least one variant, template reference is not essential.
+            skip_ref = bool(products_data.get(tmpl['id']))
+            product_rows.append((tmpl['id'], tmpl['ean13'], tmpl['reference'], str(), skip_ref))
+            product_rows.extend(products_data.pop(tmpl['id'], []))
 
-        # If there is at least one variant, template reference is not essential.
-        for product_list in products_data.values():
-            if len(product_list) > 1:
-                for tmpl_dict in filter(lambda x: not x['parent_id'], product_list):
-                    tmpl_dict['skip_ref'] = True
+        product_rows.extend(itertools.chain.from_iterable(products_data.values()))
 
-        return TemplateHub(list(itertools.chain.from_iterable(products_data.values())))
+        return TemplateHub(product_rows)
 
     def get_products_for_accessories(self):
         _logger.info('Prestashop: get_products_for_accessories()')